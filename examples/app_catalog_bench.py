@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+import time
+
+# Startup cost of the application list, cold (every desktop file parsed) versus
+#   warm (one catalog read, then the stat pass that runs in the background).
+#   Runs against a synthetic applications dir so results are comparable.
+
+APPS = 500
+
+data_home = tempfile.mkdtemp(prefix="app-catalog-bench-")
+os.makedirs(data_home + "/applications")
+for i in range(APPS):
+    with open(f"{data_home}/applications/bench-app-{i}.desktop", "w") as f:
+        f.write(
+            "[Desktop Entry]\n"
+            "Type=Application\n"
+            f"Name=Bench App {i}\n"
+            f"GenericName=Benchmark {i % 7}\n"
+            f"Comment=Synthetic application number {i}\n"
+            f"Exec=/usr/bin/true --app {i} %U\n"
+            f"Icon=bench-app-{i}\n"
+            "Keywords=bench;synthetic;test;\n"
+            "Categories=Utility;\n"
+        )
+# Must be set before GLib reads the XDG dirs
+os.environ["XDG_DATA_HOME"] = data_home
+os.environ["XDG_DATA_DIRS"] = data_home + "/empty"
+
+from fabric_config.utils.app_catalog import AppCatalog  # noqa: E402
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    catalog_path = data_home + "/app_catalog.json"
+
+    cold = AppCatalog(catalog_path)
+    cold_time = timed(lambda: (cold.scan(), cold.get_apps()))
+    cold.save(blocking=True)
+
+    warm = AppCatalog(catalog_path)
+    warm_time = timed(
+        lambda: (warm.load() or sys.exit("catalog not loaded"), warm.get_apps())
+    )
+    revalidate_time = timed(warm.find_changes)
+
+    print(f"cold:       {cold_time:.1f}ms for {len(cold.get_apps())} apps")
+    print(f"warm:       {warm_time:.1f}ms")
+    print(f"revalidate: {revalidate_time:.1f}ms (background thread)")
@@ -0,0 +1,65 @@
+import random
+import string
+import time
+from dataclasses import dataclass
+
+from fabric_config.utils.app_search import AppSearchIndex
+
+# Per keystroke search latency over a synthetic catalog of 1000 applications
+
+APPS = 1000
+QUERIES = ["f", "fi", "fir", "fire", "firef", "code", "term", "gnome sett", "xyz"]
+
+
+# Stands in for CatalogApp
+@dataclass(eq=False)
+class App:
+    name: str
+    display_name: str
+    generic_name: str | None
+    executable: str
+
+
+def make_app(i: int) -> App:
+    word = "".join(random.choices(string.ascii_lowercase, k=random.randint(4, 10)))
+    name = f"{word.capitalize()} {random.choice(['Editor', 'Viewer', 'Player', ''])}"
+    return App(
+        name=name.strip() + f" {i}",
+        display_name=name.strip(),
+        generic_name=random.choice(["Web Browser", "Terminal", "Text Editor", None]),
+        executable=f"/usr/bin/{word}",
+    )
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    apps = [make_app(i) for i in range(APPS - 3)] + [
+        App(name=name, display_name=name, generic_name=None, executable=executable)
+        for name, executable in [
+            ("Firefox", "/usr/bin/firefox"),
+            ("Visual Studio Code", "/usr/bin/code"),
+            ("GNOME Settings", "/usr/bin/gnome-control-center"),
+        ]
+    ]
+
+    start = time.perf_counter()
+    index = AppSearchIndex(apps)  # type: ignore
+    print(f"build: {(time.perf_counter() - start) * 1000:.1f}ms for {APPS} apps")
+
+    # The first search loads thefuzz
+    index.search("a")
+    # Launch scores like the app menu's frecency tie breaker
+    scores = {app.name: random.random() * 10 for app in random.sample(apps, 100)}
+
+    for tie_breaker in [None, lambda app: scores.get(app.name, 0.0)]:
+        print("with tie breaker" if tie_breaker else "without tie breaker")
+        for query in QUERIES:
+            timings = []
+            for _ in range(50):
+                results = index.search(query, tie_breaker=tie_breaker)
+                timings.append(index.last_search_time)
+            timings.sort()
+            print(
+                f"{query!r:14} median {timings[len(timings) // 2]:.3f}ms "
+                f"worst {timings[-1]:.3f}ms -> {[app.name for app in results[:3]]}"
+            )
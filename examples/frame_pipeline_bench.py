@@ -0,0 +1,65 @@
+import time
+
+import gi
+
+from fabric_config.utils.frame_pipeline import FramePipeline
+
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import GdkPixbuf, GLib  # noqa: E402
+
+# Pushes synthetic 4K frames through the pipeline, once inline on the main loop
+#   and once on workers, while a 1ms heartbeat measures how long the loop stalls.
+
+FRAMES = 40
+WIDTH, HEIGHT = 3840, 2160
+
+
+def run(threaded: bool) -> tuple[float, float, float]:
+    loop = GLib.MainLoop()
+    pipeline = FramePipeline(workers=2, threaded=threaded)
+    frame = GdkPixbuf.Pixbuf.new(GdkPixbuf.Colorspace.RGB, True, 8, WIDTH, HEIGHT)
+    frame.fill(0x336699FF)
+
+    done = 0
+    last_beat = time.perf_counter()
+    worst_stall = 0.0
+
+    def heartbeat():
+        nonlocal last_beat, worst_stall
+        now = time.perf_counter()
+        worst_stall = max(worst_stall, now - last_beat)
+        last_beat = now
+        return True
+
+    def on_ready(*_):
+        nonlocal done
+        done += 1
+        if done == FRAMES:
+            loop.quit()
+
+    def submit(i: int):
+        pipeline.submit(frame, WIDTH // 5, HEIGHT // 5, i % 4, on_ready)
+        return False
+
+    def submit_all():
+        # Spread submissions like captures coming back one by one
+        for i in range(FRAMES):
+            GLib.timeout_add(i * 5, submit, i)
+        return False
+
+    GLib.timeout_add(1, heartbeat)
+    GLib.idle_add(submit_all)
+    start = time.perf_counter()
+    loop.run()
+    return time.perf_counter() - start, pipeline.main_loop_time, worst_stall
+
+
+if __name__ == "__main__":
+    for threaded in (False, True):
+        total, main_loop, stall = run(threaded)
+        print(
+            f"{'threaded' if threaded else 'inline  '}: "
+            f"total {total * 1000:8.1f}ms, "
+            f"main loop {main_loop * 1000:8.1f}ms, "
+            f"worst stall {stall * 1000:6.1f}ms"
+        )
@@ -0,0 +1,57 @@
+import json
+import subprocess
+import sys
+
+# Imports each module in a fresh interpreter and checks that none of the heavy
+#   optional dependencies were loaded with it, and that the import stayed in
+#   its time budget. Exits non-zero on any failure.
+
+HEAVY_MODULES = [
+    "requests",
+    "colorthief",
+    "magic",
+    "thefuzz",
+    "rapidfuzz",
+    "OpenGL",
+    "rlottie_python",
+]
+# module -> import budget in milliseconds
+BUDGETS = {
+    "fabric_config.utils.accent": 150.0,
+    "fabric_config.utils.app_search": 250.0,
+    "fabric_config.services.clipboard_history": 300.0,
+    "fabric_config.components.bar.widgets.prayer_times": 400.0,
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps([elapsed, [name for name in {heavy!r} if name in sys.modules]]))
+"""
+
+
+def probe(module: str) -> tuple[float, list[str]]:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"importing {module} failed:\n{result.stderr}")
+    elapsed, loaded = json.loads(result.stdout.splitlines()[-1])
+    return elapsed, loaded
+
+
+if __name__ == "__main__":
+    failures = []
+    for module, budget in BUDGETS.items():
+        elapsed, loaded = probe(module)
+        print(f"{module:<52} {elapsed:7.1f}ms (budget {budget:.0f}ms) {loaded or ''}")
+        if elapsed > budget or loaded:
+            failures.append(module)
+
+    if failures:
+        sys.exit(f"over budget or eager heavy imports: {', '.join(failures)}")
+    print("all import budgets met")
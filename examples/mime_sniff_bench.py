@@ -0,0 +1,57 @@
+import random
+import string
+import time
+
+from fabric_config.utils.mime_sniff import sniff_mime_type
+
+# Per entry classification cost over a history of large text blobs with a few
+#   images mixed in, sniffing the first bytes versus libmagic on the payload.
+
+ENTRIES = 200
+TEXT_SIZE = 512 * 1024
+
+IMAGES = [
+    b"\x89PNG\r\n\x1a\n" + bytes(1024),
+    b"\xff\xd8\xff\xe0" + bytes(1024),
+    b"GIF89a" + bytes(1024),
+    b"RIFF\x00\x00\x00\x00WEBPVP8 " + bytes(1024),
+    b"#define icon_width 16\n#define icon_height 16\n"
+    b"static unsigned char icon_bits[] = {",
+]
+
+
+def make_history() -> list[bytes]:
+    random.seed(0)
+    alphabet = (string.ascii_letters + string.digits + " \n").encode()
+    blob = bytes(random.choices(alphabet, k=TEXT_SIZE))
+    return [
+        IMAGES[i % len(IMAGES)] if i % 20 == 0 else blob[i:] + blob[:i]
+        for i in range(ENTRIES)
+    ]
+
+
+def timed(classify, history: list[bytes]) -> tuple[float, list]:
+    start = time.perf_counter()
+    results = [classify(data) for data in history]
+    return (time.perf_counter() - start) / len(history) * 1e6, results
+
+
+if __name__ == "__main__":
+    history = make_history()
+    sniff_time, sniffed = timed(sniff_mime_type, history)
+    print(f"{ENTRIES} entries, {TEXT_SIZE // 1024}KiB text blobs")
+    print(f"sniff:    {sniff_time:9.1f}us per entry")
+
+    try:
+        import magic
+    except ImportError:
+        print("libmagic: python-magic is not installed, skipped")
+    else:
+        magic_time, detected = timed(
+            lambda data: magic.detect_from_content(data).mime_type, history
+        )
+        print(f"libmagic: {magic_time:9.1f}us per entry")
+        print(f"speedup:  {magic_time / sniff_time:9.1f}x")
+        for data, mime_type, magic_type in zip(history, sniffed, detected):
+            if mime_type.startswith("image/") != magic_type.startswith("image/"):
+                print(f"disagree: {data[:16]!r} sniff={mime_type} magic={magic_type}")
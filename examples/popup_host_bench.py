@@ -0,0 +1,100 @@
+import json
+import os
+import subprocess
+import sys
+
+# Opens the same set of popups once with every popup on its own layer surface
+#   and once in the shared per monitor host, then compares mapped surfaces,
+#   their estimated buffer memory (ARGB, double buffered) and process RSS.
+#   Needs a running Wayland session.
+
+POPUPS = [
+    ("center-left", 420, 560),
+    ("center", 900, 600),
+    ("center-right", 80, 300),
+    ("top-right", 400, 500),
+    ("top-left", 300, 400),
+    ("bottom-center", 500, 100),
+]
+SETTLE_MS = 1500
+
+
+def get_rss_kb() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def run_child():
+    from fabric.widgets.box import Box
+    from gi.repository import GLib, Gtk
+
+    from fabric_config.widgets.popup_window_v2 import PopupWindow
+
+    popups = [
+        PopupWindow(
+            anchor=anchor,
+            child=Box(size=(width, height), style_classes=["window-basic"]),
+            enable_inhibitor=True,
+        )
+        for anchor, width, height in POPUPS
+    ]
+    for popup in popups:
+        popup.toggle_popup()
+
+    def measure():
+        surfaces = [
+            window
+            for window in Gtk.Window.list_toplevels()
+            if window.get_mapped()
+        ]
+        buffer_bytes = sum(
+            window.get_allocated_width()
+            * window.get_allocated_height()
+            * window.get_scale_factor() ** 2
+            * 4
+            * 2
+            for window in surfaces
+        )
+        print(
+            json.dumps(
+                {
+                    "surfaces": len(surfaces),
+                    "buffer_mb": buffer_bytes / (1024 * 1024),
+                    "rss_mb": get_rss_kb() / 1024,
+                }
+            )
+        )
+        Gtk.main_quit()
+        return False
+
+    GLib.timeout_add(SETTLE_MS, measure)
+    Gtk.main()
+
+
+def run_mode(mode: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, __file__, "--child"],
+        env={**os.environ, "FABRIC_CONFIG_POPUP_HOST": mode},
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"{mode} run failed:\n{result.stderr}")
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        run_child()
+        sys.exit()
+
+    print(f"{len(POPUPS)} popups open at once")
+    for mode in ("window", "shared"):
+        stats = run_mode(mode)
+        print(
+            f"{mode:<8} surfaces {stats['surfaces']:3} "
+            f"buffers ~{stats['buffer_mb']:7.1f}MB rss {stats['rss_mb']:7.1f}MB"
+        )
@@ -0,0 +1,69 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Starts the shell with the startup profiler enabled, waits for the first bar
+#   frame and fails when any budget is exceeded. Needs a running Hyprland
+#   session, a second instance can not own the same application id, so quit
+#   the running shell first.
+
+TIMEOUT = 30.0
+# Milliseconds since the profiler was imported
+BUDGETS = {
+    "first_frame": 1500.0,
+    "imports_done": 800.0,
+}
+# Constructor budgets, anything not listed here gets the default
+SPAN_BUDGETS = {
+    "StatusBarSeperated": 300.0,
+    "Applications": 100.0,
+}
+DEFAULT_SPAN_BUDGET = 150.0
+
+
+def run_profiled_startup(report_path: str) -> dict:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "fabric_config.main"],
+        env={**os.environ, "FABRIC_CONFIG_PROFILE": report_path},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + TIMEOUT
+    try:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                sys.exit(f"shell exited early with code {process.returncode}")
+            if os.path.exists(report_path):
+                with open(report_path) as f:
+                    return json.load(f)
+            time.sleep(0.1)
+        sys.exit(f"no first frame after {TIMEOUT}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    report_path = tempfile.mktemp(prefix="startup-profile-", suffix=".json")
+    report = run_profiled_startup(report_path)
+
+    failures = []
+    for mark, budget in BUDGETS.items():
+        value = report["marks"].get(mark, float("inf"))
+        print(f"{mark:<32} {value:8.1f}ms (budget {budget:.0f}ms)")
+        if value > budget:
+            failures.append(mark)
+    for span in report["spans"]:
+        budget = SPAN_BUDGETS.get(span["name"], DEFAULT_SPAN_BUDGET)
+        if span["duration"] > budget:
+            print(
+                f"{span['name']:<32} {span['duration']:8.1f}ms (budget {budget:.0f}ms)"
+            )
+            failures.append(span["name"])
+
+    if failures:
+        sys.exit(f"over budget: {', '.join(failures)}")
+    print("all startup budgets met")
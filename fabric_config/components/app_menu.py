@@ -1,22 +1,21 @@
-import json
+import bisect
 import os
-from fabric.utils import (
-    DesktopApp,
-    exec_shell_command_async,
-    get_desktop_applications,
-)
+from fabric.utils import exec_shell_command_async
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.entry import Entry
 from fabric.widgets.image import Image
 from fabric.widgets.label import Label
-from fabric.widgets.scrolledwindow import ScrolledWindow
 from fabric.widgets.shapes import Corner
 from gi.repository import GLib
 from loguru import logger
-from thefuzz import fuzz, process
 
+import fabric_config.config as config
+from fabric_config.utils.app_catalog import CatalogApp
+from fabric_config.utils.app_search import AppSearchIndex
+from fabric_config.utils.frecency import FrecencyStore
 from fabric_config.widgets.popup_window_v2 import PopupWindow
+from fabric_config.widgets.recycled_list import RecycledList
 
 CACHE_DIR = str(GLib.get_user_cache_dir()) + "/fabric"
 APP_CACHE = CACHE_DIR + "/app_launcher"
@@ -26,22 +25,33 @@ if not os.path.exists(APP_CACHE):
     os.makedirs(APP_CACHE)
 
 
-def get_recent_apps() -> list:
-    recent_apps_list = []
-    if os.path.exists(APP_CACHE + "/last_launched.json"):
-        with open(APP_CACHE + "/last_launched.json", "r") as f:
-            try:
-                recent_apps_list = json.load(f)
-            except json.JSONDecodeError:
-                logger.info("[App Menu] Cache file does not exist or is corrupted")
-            finally:
-                f.close()
-    return recent_apps_list
+# app name -> 36px icon, filled in as rows are bound
+APP_ICONS: dict = {}
+
+
+RECENT_APPS_COUNT = 7
+FRECENCY_FILE = APP_CACHE + "/frecency.json"
+LEGACY_RECENT_FILE = APP_CACHE + "/last_launched.json"
 
 
 class ApplicationButtonV2(Button):
-    def __init__(self, app_info: DesktopApp, **kwargs):
-        self.app_info = app_info
+    def __init__(self, app_info: CatalogApp | None = None, **kwargs):
+        self.app_info: CatalogApp | None = None
+        self.app_icon = Image()
+        self.app_name = Label(
+            justfication="left",
+            h_align="start",
+            max_chars_width=25,
+            ellipsization="end",
+            name="appmenu-app-name",
+        )
+        self.app_description = Label(
+            justfication="left",
+            h_align="start",
+            max_chars_width=25,
+            ellipsization="end",
+            name="appmenu-app-desc",
+        )
         super().__init__(
             name="appmenu-button",
             h_expand=True,
@@ -53,32 +63,36 @@ class ApplicationButtonV2(Button):
                 spacing=10,
                 size=(350,-1),
                 children=[
-                    Image(pixbuf=app_info.get_icon_pixbuf(size=36)),
+                    self.app_icon,
                     Box(
                         orientation="v",
-                        children=[
-                            Label(
-                                app_info.display_name,
-                                justfication="left",
-                                h_align="start",
-                                max_chars_width=25,
-                                ellipsization="end",
-                                name="appmenu-app-name",
-                            ),
-                            Label(
-                                app_info.description if app_info.description else "",
-                                justfication="left",
-                                h_align="start",
-                                max_chars_width=25,
-                                ellipsization="end",
-                                name="appmenu-app-desc",
-                            ),
-                        ],
+                        children=[self.app_name, self.app_description],
                     ),
                 ],
             ),
             **kwargs,
         )
+        self.bind(app_info) if app_info else None
+
+    def bind(self, app_info: CatalogApp):
+        # Rows are recycled, the icon is loaded once the row is idle
+        self.app_info = app_info
+        self.app_name.set_label(app_info.display_name or app_info.name)
+        self.app_description.set_label(
+            app_info.description if app_info.description else ""
+        )
+        if app_info.name in APP_ICONS:
+            self.app_icon.set_from_pixbuf(APP_ICONS[app_info.name])
+            return
+        self.app_icon.clear()
+        GLib.idle_add(self.load_icon, app_info)
+
+    def load_icon(self, app_info: CatalogApp):
+        if app_info.name not in APP_ICONS:
+            APP_ICONS[app_info.name] = app_info.get_icon_pixbuf(size=36)
+        if self.app_info is app_info:
+            self.app_icon.set_from_pixbuf(APP_ICONS[app_info.name])
+        return False
 
     def launch_app(self):
         command = (
@@ -94,28 +108,19 @@ class ApplicationButtonV2(Button):
             lambda *_: logger.info(f"Launched {self.app_info.name}"),
         ) if command else None
 
-    def add_app_to_json(self) -> list:
-        data = get_recent_apps()
-
-        with open(APP_CACHE + "/last_launched.json", "w") as f:
-            if self.app_info.name in data:
-                data.remove(self.app_info.name)
-            data.insert(0, self.app_info.name)
-            data.pop() if len(data) > 7 else None
-            json.dump(data, f)
-            f.close()
-
-        return data
-
-
 class AppMenu(PopupWindow):
     def __init__(self, **kwargs):
+        # desktop id -> app, kept current by the applications service
+        self.app_ids: dict[str, CatalogApp] = dict(config.applications.applications)
         self.applications = sorted(
-            get_desktop_applications(),
+            self.app_ids.values(),
             key=lambda x: x.name.lower(),
         )
-        self.application_buttons = {}
-        self.buttons_box = Box(orientation="v", h_expand=True, v_expand=True)
+        self.applications_by_name = {app.name: app for app in self.applications}
+        self.search_index = AppSearchIndex(self.applications)
+        self.frecency = FrecencyStore(
+            FRECENCY_FILE, legacy_recent_path=LEGACY_RECENT_FILE
+        )
 
         # Entry
         self.search_app_entry = Entry(
@@ -130,21 +135,19 @@ class AppMenu(PopupWindow):
 
         self.search_app_entry.set_property("xalign", 0.5)
 
-        # Scrolled Window
-        self.scrolled_window = ScrolledWindow(
+        # Application list, only the visible rows are built
+        self.scrolled_window = RecycledList(
+            row_factory=lambda: ApplicationButtonV2(on_clicked=self.on_app_launch),
+            bind_row=self.bind_button,
+            viewport_height=540,
             name="appmenu-scroll",
             max_content_size=(-1, 540),
             min_content_size=(-1, 540),
             propagate_height=False,
             visible=False,
-            child=self.buttons_box,
         )
-
-        # Application buttons
-        for app in self.applications:
-            app_button = ApplicationButtonV2(app, on_clicked=self.on_app_launch)
-            self.application_buttons[app.name] = app_button
-            self.buttons_box.add(app_button)
+        self.highlighted_apps = 0
+        self._revealing = False
 
         # Recent applications
         self.recent_applications = Box(
@@ -154,8 +157,20 @@ class AppMenu(PopupWindow):
             h_expand=True,
             v_expand=True,
         )
+        self.recent_buttons = [
+            ApplicationButtonV2(on_clicked=self.on_app_launch)
+            for _ in range(RECENT_APPS_COUNT)
+        ]
+        # Unused slots stay hidden when the window is shown
+        for button in self.recent_buttons:
+            button.set_no_show_all(True)
+        self.recent_applications.children = self.recent_buttons
         self.update_recent_apps()
 
+        config.applications.connect("app-added", self.on_app_added)
+        config.applications.connect("app-removed", self.on_app_removed)
+        config.applications.connect("app-changed", self.on_app_changed)
+
         super().__init__(
             transition_duration=300,
             decorations="margin: 1px 1px 1px 0px;",
@@ -196,22 +211,61 @@ class AppMenu(PopupWindow):
             keyboard_mode="on-demand",
         )
 
-    def update_recent_apps(self, recent_apps: list | None = None):
-        self.recent_applications.children = []
-        recent_apps = get_recent_apps() if not recent_apps else recent_apps
-        for app_id in recent_apps:
-            [
-                self.recent_applications.add(
-                    ApplicationButtonV2(app, on_clicked=self.on_app_launch)
-                )
-                for app in self.applications
-                if app.name == app_id
-            ]
+    def update_recent_apps(self):
+        recent_apps = [
+            self.applications_by_name[name]
+            for name in self.frecency.top(RECENT_APPS_COUNT * 2)
+            if name in self.applications_by_name
+        ][:RECENT_APPS_COUNT]
+        for i, button in enumerate(self.recent_buttons):
+            if i < len(recent_apps):
+                if button.app_info is not recent_apps[i]:
+                    button.bind(recent_apps[i])
+                button.show()
+            else:
+                button.hide()
+
+    def add_app(self, desktop_id: str):
+        app = config.applications.get_app(desktop_id)
+        if app is None:
+            return
+        self.app_ids[desktop_id] = app
+        bisect.insort(self.applications, app, key=lambda x: x.name.lower())
+        self.applications_by_name[app.name] = app
+        self.search_index.add(app)
+
+    def remove_app(self, desktop_id: str):
+        app = self.app_ids.pop(desktop_id, None)
+        if app is None:
+            return
+        self.applications.remove(app)
+        self.applications_by_name.pop(app.name, None)
+        self.search_index.remove(app)
+        APP_ICONS.pop(app.name, None)
+
+    def on_app_added(self, _, desktop_id: str):
+        self.add_app(desktop_id)
+        self.refresh_app_list()
+
+    def on_app_removed(self, _, desktop_id: str):
+        self.remove_app(desktop_id)
+        self.refresh_app_list()
+
+    def on_app_changed(self, _, desktop_id: str):
+        self.remove_app(desktop_id)
+        self.add_app(desktop_id)
+        self.refresh_app_list()
+
+    def refresh_app_list(self):
+        self.update_recent_apps()
+        if self.scrolled_window.get_visible():
+            self.on_entry_change(self.search_app_entry)
 
     def on_app_launch(self, app_button: ApplicationButtonV2, *_):
         app_button.launch_app()
         self.toggle_popup()
-        self.update_recent_apps(app_button.add_app_to_json())
+        self.frecency.add_launch(app_button.app_info.name)
+        self.update_recent_apps()
 
     # Overrides
     def toggle_popup(self, monitor: bool | None = None):
@@ -233,21 +287,38 @@ class AppMenu(PopupWindow):
         self.search_app_entry.add_style_class(
             "active"
         ) if "active" not in self.search_app_entry.style_classes else None
-        for child in self.buttons_box.children:
-            self.reset_button(child)
-        lister = process.extract(  # type: ignore
+        matches = self.search_index.search(
             entry.get_text(),
-            self.application_buttons.keys(),
-            scorer=fuzz.partial_ratio,
             limit=10,
+            tie_breaker=lambda app: self.frecency.get_score(app.name),
+        )
+        logger.debug(
+            f"[App Menu] search took {self.search_index.last_search_time:.3f}ms"
+        )
+        matched_names = {app.name for app in matches}
+        self.highlighted_apps = len(matches)
+        # Rows bound by set_items are highlighted by the staggered reveal
+        self._revealing = True
+        self.scrolled_window.set_items(
+            matches
+            + [app for app in self.applications if app.name not in matched_names]
         )
+        self._revealing = False
+        for child, i in self.scrolled_window.get_bound_rows():
+            if i < self.highlighted_apps:
+                GLib.timeout_add((i + 1) * 20, self.set_button, child, child.app_info)
 
-        for i, name in enumerate(lister):
-            child = self.application_buttons[name[0]]
-            self.buttons_box.reorder_child(child, i)
-            GLib.timeout_add((i + 1) * 20, self.set_button, child)
+    def bind_button(self, button: ApplicationButtonV2, app_info: CatalogApp, i: int):
+        self.reset_button(button)
+        button.bind(app_info)
+        # Scrolled back to a match
+        if i < self.highlighted_apps and not self._revealing:
+            self.set_button(button, app_info)
 
-    def set_button(self, child):
+    def set_button(self, child, app_info: CatalogApp | None = None):
+        # The row may have been rebound before the timeout fired
+        if app_info and child.app_info is not app_info:
+            return False
         child.set_style("animation-duration: 500ms;")
         child.add_style_class("shine")
         return False
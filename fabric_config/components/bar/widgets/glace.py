@@ -1,6 +1,6 @@
 import gi
-from fabric_config.utils.icon_resolver import IconResolver
 
+import fabric_config.config as config
 from fabric.widgets.box import Box
 from fabric.widgets.button import Button
 from fabric.widgets.image import Image
@@ -15,7 +15,7 @@ class OpenAppsBar(Box):
     def __init__(self):
         self.client_buttons = {}
         super().__init__(spacing=10)
-        self.icon_resolver = IconResolver()
+        self.icon_resolver = config.icon_resolver
         self._manager = Glace.Manager()
         self._manager.connect("client-added", self.on_client_added)
 
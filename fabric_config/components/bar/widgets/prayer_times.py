@@ -2,7 +2,6 @@ import datetime
 import json
 import os
 
-import requests
 from fabric.core.service import Property, Service, Signal
 from fabric.utils import exec_shell_command, invoke_repeater
 from fabric.widgets.box import Box
@@ -11,8 +10,12 @@ from fabric.widgets.centerbox import CenterBox
 from fabric.widgets.label import Label
 from gi.repository import GLib
 
+from fabric_config.utils.lazy_import import lazy_import
 from fabric_config.widgets.popup_window_v2 import PopupWindow
 
+# Only needed when the cached times are stale
+requests = lazy_import("requests")
+
 city = "Toronto"
 country = "Canada"
 api_request = (
@@ -1,6 +1,6 @@
 from fabric.widgets.button import Button
 from fabric.widgets.image import Image
-from fabric_config.components.wallpaper_picker import wallpaper_picker
+from fabric_config.components.wallpaper_picker import get_wallpaper_picker
 
 
 class WallpapperPickerButton(Button):
@@ -8,5 +8,5 @@ class WallpapperPickerButton(Button):
         super().__init__(
             image=Image(icon_name="image-x-generic-symbolic"),
             style_classes=["button-basic", "button-basic-props", "button-border"],
-            on_clicked=lambda *_: wallpaper_picker.toggle_popup(),
+            on_clicked=lambda *_: get_wallpaper_picker().toggle_popup(),
         )
@@ -11,13 +11,15 @@ from fabric.widgets.revealer import Revealer
 from fabric.widgets.wayland import WaylandWindow as Window
 from loguru import logger
 
+import fabric_config.config as config
 from fabric_config.snippits.popupwindow import PopupWindow
-from fabric_config.utils.icon_resolver import IconResolver
 from fabric_config.utils.hyprland_monitor import HyprlandWithMonitors
 
 gi.require_version("Glace", "0.1")
 from gi.repository import Glace, GLib
 
+PREVIEW_SCALE = 0.2
+
 CACHE_DIR = str(GLib.get_user_cache_dir()) + "/fabric"
 APP_CACHE = CACHE_DIR + "/dock"
 if not os.path.exists(CACHE_DIR):
@@ -59,7 +61,7 @@ class AppBar(Box):
                 )
             ],
         )
-        self.icon_resolver = IconResolver()
+        self.icon_resolver = config.icon_resolver
         self._manager = Glace.Manager()
         self._manager.connect("client-added", self.on_client_added)
         self._preview_image = Image()
@@ -90,15 +92,49 @@ class AppBar(Box):
             else None,
         )
 
+    def show_preview_image(self, pixbuf):
+        self._preview_image.set_from_pixbuf(pixbuf)
+        self.popup.set_visible(True)
+        self.popup_revealer.reveal()
+
+    def get_client_size(self, client) -> tuple[int, int] | None:
+        # Glace doesn't report geometry, the window is looked up in the
+        #   hyprland state by class and title
+        sizes = [
+            tuple(hypr_client["size"])
+            for hypr_client in config.hyprland_state.clients.values()
+            if hypr_client.get("class") == client.get_app_id()
+            and hypr_client.get("title") == client.get_title()
+        ]
+        return sizes[0] if len(sizes) == 1 else None
+
     def update_preview_image(self, client, client_button: Button):
         self.popup.set_pointing_to(client_button)
+        cache_key = f"dock:{client.get_id()}"
+        # A resized window misses the cache, an ambiguous one is not cached
+        window_size = self.get_client_size(client)
+        cache_size = (PREVIEW_SCALE, window_size)
+
+        cached = (
+            config.preview_cache.get(cache_key, cache_size) if window_size else None
+        )
+        if cached:
+            return self.show_preview_image(cached)
+
+        def on_preview_ready(preview, _):
+            if window_size:
+                config.preview_cache.invalidate(cache_key)
+                config.preview_cache.put(cache_key, cache_size, preview)
+            self.show_preview_image(preview)
 
         def capture_callback(pbuf, _):
-            self._preview_image.set_from_pixbuf(
-                pbuf.scale_simple(pbuf.get_width() * 0.2, pbuf.get_height() * 0.2, 2)
+            config.frame_pipeline.submit(
+                pbuf,
+                int(pbuf.get_width() * PREVIEW_SCALE),
+                int(pbuf.get_height() * PREVIEW_SCALE),
+                0,
+                on_preview_ready,
             )
-            self.popup.set_visible(True)
-            self.popup_revealer.reveal()
 
         self._manager.capture_client(
             client=client,
@@ -149,7 +185,18 @@ class AppBar(Box):
             else client_button.remove_style_class("active"),
         )
 
-        client.connect("close", lambda *_: self.remove(client_button))
+        client.connect(
+            "notify::title",
+            lambda *_: config.preview_cache.invalidate(f"dock:{client.get_id()}"),
+        )
+
+        client.connect(
+            "close",
+            lambda *_: [
+                config.preview_cache.invalidate(f"dock:{client.get_id()}"),
+                self.remove(client_button),
+            ],
+        )
         self.add(client_button)
 
 
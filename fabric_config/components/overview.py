@@ -1,6 +1,5 @@
 from ast import Tuple
 from cProfile import label
-import json
 
 import cairo
 from fabric.utils import invoke_repeater
@@ -14,7 +13,13 @@ from fabric.widgets.label import Label
 from fabric.widgets.overlay import Overlay
 from loguru import logger
 
-from fabric_config.utils.icon_resolver import IconResolver
+import fabric_config.config as config
+from fabric_config.services.capture_scheduler import (
+    PRIORITY_FOCUSED,
+    PRIORITY_HIDDEN,
+    PRIORITY_VISIBLE,
+    CaptureScheduler,
+)
 from fabric.widgets.eventbox import EventBox
 from fabric_config.utils.pywayland_export_toplevel import ClientOutput
 from fabric_config.widgets.popup_window_v2 import PopupWindow
@@ -23,7 +28,7 @@ from fabric_config.widgets.rounded_image import CustomImage
 gi.require_version("Gtk", "3.0")
 from gi.repository import Gdk, GdkPixbuf, GLib, Glace, Gtk
 
-icon_resolver = IconResolver()
+icon_resolver = config.icon_resolver
 connection = Hyprland()
 SCALE = 0.2
 
@@ -88,6 +93,14 @@ class HyprlandWindowButton(Button):
             actions=Gdk.DragAction.COPY,
         )
 
+    def update_client(self, title: str, size, transform: int = 0):
+        self.transform = transform % 4
+        self.size = size if transform in [0, 2] else (size[1], size[0])
+        if title != self.title:
+            self.title = title
+            self.set_tooltip_text(title)
+        self.set_size_request(*size)
+
     def update_image(self, image):
         self.set_image(
             Overlay(
@@ -108,24 +121,23 @@ class HyprlandWindowButton(Button):
 
 
 class WorkspaceEventBox(EventBox):
-    def __init__(self, workspace_id: int, fixed: Gtk.Fixed | None = None):
-        self.fixed = fixed
+    def __init__(self, workspace_id: int):
+        self.fixed = Gtk.Fixed.new()
+        # TODO this is lazy, do it right later lol
+        self.placeholder = Image(
+            h_expand=True,
+            v_expand=True,
+            pixbuf=Gtk.IconTheme()
+            .get_default()
+            .load_icon("list-add", 64, Gtk.IconLookupFlags.FORCE_SIZE),
+        )
         super().__init__(
             h_expand=True,
             v_expand=True,
             size=(int(1920 * SCALE), int(1080 * SCALE)),
             name="overview-workspace-bg",
             style_classes=["cool-border"],
-            child=fixed
-            if fixed
-            # TODO this is lazy, do it right later lol
-            else Image(
-                h_expand=True,
-                v_expand=True,
-                pixbuf=Gtk.IconTheme()
-                .get_default()
-                .load_icon("list-add", 64, Gtk.IconLookupFlags.FORCE_SIZE),
-            ),
+            child=self.placeholder,
             on_drag_data_received=lambda _w,
             _c,
             _x,
@@ -140,26 +152,64 @@ class WorkspaceEventBox(EventBox):
             TARGET,
             Gdk.DragAction.COPY,
         )
-        fixed.show_all() if fixed else None
+
+    def put(self, button: HyprlandWindowButton, x: float, y: float):
+        self.fixed.put(button, x, y)
+        button.show_all()
+        self.update_placeholder()
+
+    def move(self, button: HyprlandWindowButton, x: float, y: float):
+        self.fixed.move(button, x, y)
+
+    def remove_button(self, button: HyprlandWindowButton):
+        self.fixed.remove(button)
+        self.update_placeholder()
+
+    def update_placeholder(self):
+        child = self.fixed if self.fixed.get_children() else self.placeholder
+        if self.get_child() is not child:
+            self.children = child
+            child.show_all()
 
 
 # TODO update with monitors for later....
 class Overview(PopupWindow):
     def __init__(self):
         self.glace_manager = Glace.Manager()
+        self.capture_scheduler = CaptureScheduler(self.glace_manager)
         # self.client_output = ClientOutput()
+        self.workspace_boxes: dict[int, WorkspaceEventBox] = {
+            w_id: WorkspaceEventBox(w_id) for w_id in range(1, 9)
+        }
         self.overview_box = Box(
             name="overview-window",
             style_classes=["cool-border"],
             orientation="v",
             spacing=5,
+            children=[
+                Box(
+                    children=[
+                        Box(
+                            name="overview-workspace-box",
+                            orientation="vertical",
+                            children=[
+                                self.workspace_boxes[w_id],
+                                Label(f"Workspace {w_id}"),
+                            ],
+                        )
+                        for w_id in w_ids
+                    ]
+                )
+                for w_ids in (range(1, 5), range(5, 9))
+            ],
         )
-        self.workspace_boxes: dict[int, Box] = {}
         self.clients: dict[str, HyprlandWindowButton] = {}
+        # address -> (workspace id, position, size, transform, title)
+        self.client_states: dict[str, tuple] = {}
 
-        connection.connect("event::openwindow", self.do_update)
-        connection.connect("event::closewindow", self.do_update)
-        connection.connect("event::movewindow", self.do_update)
+        config.hyprland_state.connect("client-added", self.do_update)
+        config.hyprland_state.connect("client-removed", self.do_update)
+        config.hyprland_state.connect("client-changed", self.do_update)
 
         # self.client_output.connect("frame-ready", update_pixbuf)
 
@@ -171,111 +221,133 @@ class Overview(PopupWindow):
             child=self.overview_box,
         )
 
-    def update(self, signal_update=False):
-        for client in self.clients.values():
-            client.destroy()
-        self.clients.clear()
+    def get_client_state(self, client: dict) -> tuple | None:
+        monitor = config.hyprland_state.get_monitor(client["monitor"])
+        # We don't want any special workspaces to be included
+        if (
+            not monitor
+            or client["workspace"]["id"] not in self.workspace_boxes
+            or not all(client["size"])
+        ):
+            return None
+        return (
+            client["workspace"]["id"],
+            (
+                int(abs(client["at"][0] - monitor["x"]) * SCALE),
+                int(abs(client["at"][1] - monitor["y"]) * SCALE),
+            ),
+            (int(client["size"][0] * SCALE), int(client["size"][1] * SCALE)),
+            monitor["transform"],
+            client["title"],
+        )
 
-        for workspace in self.workspace_boxes.values():
-            workspace.destroy()
-        self.workspace_boxes.clear()
+    def update(self):
+        # Full diff against the store, only touches what changed
+        clients = config.hyprland_state.clients
+        for address in [a for a in self.clients if a not in clients]:
+            self.reconcile_client(address)
+        for address in clients:
+            self.reconcile_client(address, capture=False)
 
-        self.overview_box_rows = [Box(), Box()]
-        self.overview_box.children = self.overview_box_rows
+        for client_addr in self.clients.keys():
+            self.capture_client(client_addr)
 
-        monitors = {
-            monitor["id"]: (monitor["x"], monitor["y"], monitor["transform"])
-            for monitor in json.loads(
-                connection.send_command("j/monitors").reply.decode()
-            )
-        }
+    def reconcile_client(self, address: str, capture: bool = True):
+        client = config.hyprland_state.get_client(address)
+        state = self.get_client_state(client) if client else None
+        old_state = self.client_states.get(address)
+        if state == old_state:
+            return
 
-        for client in json.loads(
-            str(connection.send_command("j/clients").reply.decode())
-        ):
-            # We don't want any special workspaces to be included
-            if client["workspace"]["id"] > 0:
-                self.clients[client["address"]] = HyprlandWindowButton(
-                    window=self,
-                    title=client["title"],
-                    address=client["address"],
-                    app_id=client["initialClass"],
-                    size=(client["size"][0] * SCALE, client["size"][1] * SCALE),
-                    transform=monitors[client["monitor"]][2],
-                )
-                if client["workspace"]["id"] not in self.workspace_boxes:
-                    self.workspace_boxes.update(
-                        {client["workspace"]["id"]: Gtk.Fixed.new()}
-                    )
-                self.workspace_boxes[client["workspace"]["id"]].put(
-                    self.clients[client["address"]],
-                    abs(client["at"][0] - monitors[client["monitor"]][0]) * SCALE,
-                    abs(client["at"][1] - monitors[client["monitor"]][1]) * SCALE,
-                )
-        # total_workspaces = (
-        #     range(1, max(self.workspace_boxes.keys()) + 2)
-        #     if len(self.workspace_boxes) != 0
-        #     else []
-        # )
-        for w_id in range(1, 9):
-            if w_id <= 4:
-                overview_row = self.overview_box.children[0]
-            else:
-                overview_row = self.overview_box.children[1]
-            overview_row.add(
-                Box(
-                    name="overview-workspace-box",
-                    orientation="vertical",
-                    children=[
-                        WorkspaceEventBox(
-                            w_id,
-                            self.workspace_boxes[w_id]
-                            if w_id in self.workspace_boxes
-                            else None,
-                        ),
-                        Label(f"Workspace {w_id}"),
-                    ],
-                )
-            )
+        if state is None:
+            self.capture_scheduler.cancel(address)
+            config.preview_cache.invalidate(address)
+            self.client_states.pop(address)
+            button = self.clients.pop(address)
+            self.workspace_boxes[old_state[0]].remove_button(button)
+            button.destroy()
+            return
 
-        def update_pixbuf(pixbuf, address):
-            if address not in self.clients:
-                return
-            self.clients[address].update_image(
-                CustomImage(
-                    name="overview-frame",
-                    pixbuf=GdkPixbuf.Pixbuf.scale_simple(
-                        pixbuf,
-                        self.clients[address].size[0] - 7,
-                        self.clients[address].size[1] - 7,
-                        GdkPixbuf.InterpType.BILINEAR,
-                    ).rotate_simple(
-                        {
-                            0: GdkPixbuf.PixbufRotation.NONE,
-                            1: GdkPixbuf.PixbufRotation.CLOCKWISE,
-                            2: GdkPixbuf.PixbufRotation.UPSIDEDOWN,
-                            3: GdkPixbuf.PixbufRotation.COUNTERCLOCKWISE,
-                        }.get(
-                            self.clients[address].transform,
-                            GdkPixbuf.PixbufRotation.NONE,
-                        )
-                    ),
-                )
+        workspace_id, position, size, transform, title = state
+        self.client_states[address] = state
+        if old_state is None:
+            button = HyprlandWindowButton(
+                window=self,
+                title=title,
+                address=address,
+                app_id=client["initialClass"],
+                size=size,
+                transform=transform,
             )
+            self.clients[address] = button
+            self.workspace_boxes[workspace_id].put(button, *position)
+        else:
+            button = self.clients[address]
+            button.update_client(title, size, transform)
+            if old_state[0] != workspace_id:
+                self.workspace_boxes[old_state[0]].remove_button(button)
+                self.workspace_boxes[workspace_id].put(button, *position)
+            elif old_state[1] != position:
+                self.workspace_boxes[workspace_id].move(button, *position)
+            # Moving a window doesn't change what it looks like
+            if old_state[2:] == state[2:]:
+                return
+            config.preview_cache.invalidate(address)
 
-        for client_addr in self.clients.keys():
-            try:
-                self.glace_manager.capture_client_handle(
-                    int(client_addr, 16), False, update_pixbuf, client_addr
-                )
-            except Exception as e:
-                logger.error(f"Error capturing client {client_addr}: {e}")
+        if capture:
+            self.capture_client(address)
+
+    def get_capture_priority(self, address: str) -> int:
+        workspace_id = self.client_states[address][0]
+        if workspace_id == config.hyprland_state.active_workspace.get("id"):
+            return PRIORITY_FOCUSED
+        if workspace_id in [
+            monitor["activeWorkspace"]["id"]
+            for monitor in config.hyprland_state.monitors.values()
+        ]:
+            return PRIORITY_VISIBLE
+        return PRIORITY_HIDDEN
+
+    def capture_client(self, address: str):
+        button = self.clients[address]
+        cached = config.preview_cache.get(address, (button.size, button.transform))
+        if cached:
+            button.update_image(CustomImage(name="overview-frame", pixbuf=cached))
+            return
+        self.capture_scheduler.request(
+            address, self.update_pixbuf, self.get_capture_priority(address)
+        )
+
+    def update_pixbuf(self, pixbuf, address):
+        if address not in self.clients:
+            return
+        button = self.clients[address]
+        config.frame_pipeline.submit(
+            pixbuf,
+            button.size[0] - 7,
+            button.size[1] - 7,
+            button.transform,
+            self.on_preview_ready,
+            (address, (button.size, button.transform)),
+        )
+
+    def on_preview_ready(self, preview, user_data):
+        address, cache_size = user_data
+        config.preview_cache.put(address, cache_size, preview)
+        button = self.clients.get(address)
+        # The client may have been resized or closed while scaling
+        if not button or (button.size, button.transform) != cache_size:
+            return
+        button.update_image(CustomImage(name="overview-frame", pixbuf=preview))
 
-    def do_update(self, *_):
+    def do_update(self, _, address: str):
         if self.popup_visible:
-            logger.info(f"[Overview] Updating for :{_[1].name}")
-            self.update(signal_update=True)
+            logger.info(f"[Overview] Updating for :{address}")
+            self.reconcile_client(address)
 
     def toggle_popup(self, monitor: bool | None = None):
-        self.update() if not self.popup_visible else None
+        if not self.popup_visible:
+            self.update()
+        else:
+            self.capture_scheduler.cancel_all()
         return super().toggle_popup(monitor=False)
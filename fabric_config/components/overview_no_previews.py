@@ -11,8 +11,8 @@ from fabric.widgets.label import Label
 from fabric.widgets.overlay import Overlay
 from loguru import logger
 
-# WIP icon resolver (app_id to guessing the icon name)
-from fabric_config.utils.icon_resolver import IconResolver
+# WIP icon resolver (app_id to guessing the icon name), shared through config
+import fabric_config.config as config
 
 # Popup window implementation (allows for pressing escape or clicking outside to close the window and stuff)
 from fabric_config.widgets.popup_window_v2 import PopupWindow
@@ -20,7 +20,7 @@ from fabric_config.widgets.popup_window_v2 import PopupWindow
 gi.require_version("Gtk", "3.0")
 from gi.repository import Gdk, Gtk
 
-icon_resolver = IconResolver()
+icon_resolver = config.icon_resolver
 connection = Hyprland()
 SCALE = 0.2
 
@@ -155,4 +155,12 @@ class WallPaperPickerOverlay(PopupWindow):
             self.wallpaper_box.grab_wallpaper_images()
 
 
-wallpaper_picker = WallPaperPickerOverlay()
+_wallpaper_picker: WallPaperPickerOverlay | None = None
+
+
+def get_wallpaper_picker() -> WallPaperPickerOverlay:
+    # Built on first use, the bar button and the app action share it
+    global _wallpaper_picker
+    if _wallpaper_picker is None:
+        _wallpaper_picker = WallPaperPickerOverlay()
+    return _wallpaper_picker
@@ -2,19 +2,38 @@ from fabric.audio import Audio
 from fabric.bluetooth import BluetoothClient
 import gi
 
+from fabric_config.services.applications import Applications
 from fabric_config.services.brightness import Brightness
+from fabric_config.services.hyprland_state import HyprlandState
+from fabric_config.services.monitor_tracker import MonitorTracker
 from fabric_config.services.mpris_v2 import MprisPlayerManager
 from fabric_config.services.screen_record import ScreenRecorder
+from fabric_config.utils.frame_pipeline import FramePipeline
+from fabric_config.utils.icon_resolver import IconResolver
+from fabric_config.utils.preview_cache import PreviewCache
+from fabric_config.utils.startup_profiler import profiler
 gi.require_version("AstalNetwork", "0.1")
 from gi.repository import AstalNetwork as Network
 
 # Services
-mprisplayer = MprisPlayerManager()
-bluetooth_client = BluetoothClient()
-audio = Audio()
-sc = ScreenRecorder()
-brightness = Brightness()
-network = Network.get_default()
+mprisplayer = profiler.measure(MprisPlayerManager)
+bluetooth_client = profiler.measure(BluetoothClient)
+audio = profiler.measure(Audio)
+sc = profiler.measure(ScreenRecorder)
+brightness = profiler.measure(Brightness)
+network = profiler.measure(Network.get_default)
+applications = profiler.measure(Applications)
+# Desktop file changes are pushed from the applications service
+icon_resolver = profiler.measure(IconResolver, watch_desktop_files=False)
+applications.connect(
+    "desktop-file-changed", lambda _, path: icon_resolver.update_desktop_file(path)
+)
+hyprland_state = profiler.measure(HyprlandState)
+monitor_tracker = profiler.measure(MonitorTracker, hyprland_state)
+
+# Shared by the overview and dock window previews
+preview_cache = PreviewCache(max_bytes=64 * 1024 * 1024, max_age=30.0)
+frame_pipeline = FramePipeline(workers=2)
 
 bluetooth_icons_names = {
     "bluetooth": "bluetooth-active-symbolic",
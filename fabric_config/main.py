@@ -1,3 +1,6 @@
+# Must stay the first import, it times the ones below
+from fabric_config.utils.startup_profiler import profiler
+
 from fabric import Application
 from fabric.utils import get_relative_path, monitor_file
 from loguru import logger
@@ -13,32 +16,40 @@ from fabric_config.components import (
 from fabric_config.components.bar.bar import ScreenCorners
 from fabric_config.components.overview import Overview
 from fabric_config.components.dock import AppDock
-from fabric_config.components.wallpaper_picker import wallpaper_picker
+from fabric_config.components.wallpaper_picker import get_wallpaper_picker
+from fabric_config.utils.lazy_components import LazyComponents
 
 
 class MyApp(Application):
     def __init__(self):
+        profiler.mark("imports_done")
         self.sc = config.sc
-        self.screen_corners = ScreenCorners()
-        self.bar = StatusBarSeperated()
-        self.clockWidget = ClockWidget()
-        self.overview = Overview()
-        self.systemOverlay = SystemOSD()
-        self.nc = NotificationPopup()
-        self.appMenu = AppMenu()
-        self.dock = AppDock()
-        self.wallpaper_picker = wallpaper_picker
+        self.screen_corners = profiler.measure(ScreenCorners)
+        self.bar = profiler.measure(StatusBarSeperated)
+        self.clockWidget = profiler.measure(ClockWidget)
+        # Everything else is built after the bar is on screen
+        self.components = LazyComponents(on_built=self.add_window)
+        self.components.register("notifications", NotificationPopup, prewarm=True)
+        self.components.register("dock", AppDock, prewarm=True)
+        self.components.register("system_osd", SystemOSD, prewarm=True)
+        self.components.register("app_menu", AppMenu, prewarm=True)
+        self.components.register("overview", Overview)
+        self.components.register("wallpaper_picker", get_wallpaper_picker)
         super().__init__(
             "fabric-bar",
             self.bar,
             self.clockWidget,
-            self.systemOverlay,
-            self.nc,
-            self.appMenu,
-            self.overview,
-            self.dock,
         )
         self.apply_style()
+        if profiler.enabled:
+            self.bar.connect("draw", self.on_first_draw)
+        self.components.prewarm()
+
+    def on_first_draw(self, *_):
+        self.bar.disconnect_by_func(self.on_first_draw)
+        profiler.mark("first_frame")
+        profiler.finish()
+        return False
 
     def apply_style(self):
         logger.info("[Main] CSS applied")
@@ -49,11 +60,11 @@ def main():
 
     @the_app.action()
     def toggle_appmenu():
-        the_app.appMenu.toggle_popup()
+        the_app.components.get("app_menu").toggle_popup()
 
     @the_app.action()
     def toggle_overview():
-        the_app.overview.toggle_popup()
+        the_app.components.get("overview").toggle_popup()
 
     @the_app.action()
     def take_screenshot(fullscreen=False):
@@ -69,11 +80,11 @@ def main():
 
     @the_app.action()
     def toggle_system_osd(osd_type: str):
-        the_app.systemOverlay.enable_popup(osd_type)
+        the_app.components.get("system_osd").enable_popup(osd_type)
 
     @the_app.action()
     def toggle_wallpaper_picker():
-        the_app.wallpaper_picker.toggle_popup()
+        the_app.components.get("wallpaper_picker").toggle_popup()
 
     @the_app.action()
     def quit():
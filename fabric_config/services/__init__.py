@@ -1,10 +1,16 @@
+from .applications import Applications
 from .brightness import Brightness
+from .hyprland_state import HyprlandState
+from .monitor_tracker import MonitorTracker
 from .mpris import MprisPlayer, MprisPlayerManager
 from .screen_record import ScreenRecorder
 from .wifi import NetworkClient, Wifi
 
 __all__ = [
+    "Applications",
     "Brightness",
+    "HyprlandState",
+    "MonitorTracker",
     "MprisPlayer",
     "MprisPlayerManager",
     "ScreenRecorder",
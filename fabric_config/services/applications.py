@@ -0,0 +1,152 @@
+import os
+import threading
+
+from fabric.core.service import Property, Service, Signal
+from gi.repository import Gio, GLib
+from loguru import logger
+
+from fabric_config.utils.app_catalog import AppCatalog, CatalogApp
+from fabric_config.utils.icon_resolver import DesktopFileIndex
+
+CHANGE_DEBOUNCE_MS = 200
+
+
+def load_desktop_app_info(desktop_id: str) -> Gio.DesktopAppInfo | None:
+    # The first applications dir containing the id wins, same as the XDG spec
+    for data_dir in DesktopFileIndex.get_application_dirs():
+        path = data_dir + desktop_id
+        if not os.path.exists(path):
+            continue
+        app_info = Gio.DesktopAppInfo.new_from_filename(path)
+        if app_info is None or not app_info.should_show():
+            return None
+        return app_info
+    return None
+
+
+class Applications(Service):
+    @Signal
+    def app_added(self, desktop_id: str) -> str: ...
+
+    @Signal
+    def app_removed(self, desktop_id: str) -> str: ...
+
+    @Signal
+    def app_changed(self, desktop_id: str) -> str: ...
+
+    # Any desktop file that changed on disk, shown or not
+    @Signal
+    def desktop_file_changed(self, path: str) -> str: ...
+
+    def __init__(self, catalog: AppCatalog | None = None, **kwargs):
+        self._catalog = catalog or AppCatalog()
+        self._applications: dict[str, CatalogApp] = {}
+        self._pending: set[str] = set()
+        self._pending_source: int | None = None
+        # Changes wait for the cold scan, it replaces the catalog contents
+        self._scanning = False
+        self._monitors: list[Gio.FileMonitor] = []
+        super().__init__(**kwargs)
+
+        # Nothing but the json read happens before the first frame
+        if self._catalog.load():
+            # Warm start, whatever changed while we were not running is
+            #   applied like any other desktop file change
+            self._applications = self._catalog.get_apps()
+            self.run_in_background(self._revalidate)
+        else:
+            # Cold start, apps are added as if they were just installed
+            self._scanning = True
+            self.run_in_background(self._scan)
+
+        for data_dir in DesktopFileIndex.get_application_dirs():
+            if not os.path.isdir(data_dir):
+                continue
+            monitor = Gio.File.new_for_path(data_dir).monitor_directory(
+                Gio.FileMonitorFlags.WATCH_MOVES, None
+            )
+            monitor.connect("changed", self.on_directory_changed)
+            self._monitors.append(monitor)
+
+    def on_directory_changed(self, _, file: Gio.File, other: Gio.File | None, event):
+        if event not in (
+            Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+            Gio.FileMonitorEvent.DELETED,
+            Gio.FileMonitorEvent.MOVED_IN,
+            Gio.FileMonitorEvent.MOVED_OUT,
+            Gio.FileMonitorEvent.RENAMED,
+        ):
+            return
+        self.queue_paths(
+            changed.get_path() for changed in (file, other) if changed is not None
+        )
+
+    def run_in_background(self, function):
+        def start():
+            threading.Thread(target=function, daemon=True).start()
+            return False
+
+        GLib.idle_add(start, priority=GLib.PRIORITY_LOW)
+
+    def queue_paths(self, paths):
+        self._pending.update(
+            path for path in paths if path and path.endswith(".desktop")
+        )
+        # Package managers touch many files at once
+        if self._pending and self._pending_source is None and not self._scanning:
+            self._pending_source = GLib.timeout_add(
+                CHANGE_DEBOUNCE_MS, self._apply_pending
+            )
+        return False
+
+    def _scan(self):
+        logger.info("[Applications] Building the application catalog")
+        self._catalog.scan()
+        GLib.idle_add(self._on_scanned)
+
+    def _on_scanned(self):
+        self._scanning = False
+        self._catalog.save()
+        for desktop_id, app in self._catalog.get_apps().items():
+            if desktop_id not in self._applications:
+                self._applications[desktop_id] = app
+                self.app_added(desktop_id)
+        # Changes seen while scanning
+        self.queue_paths(())
+        return False
+
+    def _revalidate(self):
+        changed = self._catalog.find_changes()
+        if changed:
+            logger.info(f"[Applications] {len(changed)} desktop files changed")
+            GLib.idle_add(self.queue_paths, changed)
+
+    def _apply_pending(self):
+        self._pending_source = None
+        pending, self._pending = self._pending, set()
+        for path in pending:
+            self._catalog.update_file(path)
+            self.desktop_file_changed(path)
+            self._update_desktop_id(os.path.basename(path))
+        self._catalog.queue_save()
+        return False
+
+    def _update_desktop_id(self, desktop_id: str):
+        app = self._catalog.set_app(desktop_id, load_desktop_app_info(desktop_id))
+        existed = desktop_id in self._applications
+        if app is None:
+            if existed:
+                del self._applications[desktop_id]
+                logger.info(f"[Applications] removed {desktop_id}")
+                self.app_removed(desktop_id)
+            return
+        self._applications[desktop_id] = app
+        logger.info(f"[Applications] {'updated' if existed else 'added'} {desktop_id}")
+        self.app_changed(desktop_id) if existed else self.app_added(desktop_id)
+
+    def get_app(self, desktop_id: str) -> CatalogApp | None:
+        return self._applications.get(desktop_id)
+
+    @Property(dict, "readable")
+    def applications(self) -> dict:
+        return self._applications
@@ -0,0 +1,161 @@
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Callable
+
+import gi
+from fabric.core.service import Property, Service, Signal
+from loguru import logger
+
+gi.require_version("Glace", "0.1")
+from gi.repository import Glace, GLib
+
+# Lower value means captured sooner
+PRIORITY_FOCUSED = 0
+PRIORITY_VISIBLE = 1
+PRIORITY_HIDDEN = 2
+
+# Glace never calls back for a capture that failed, release the slot after this
+CAPTURE_TIMEOUT_MS = 2000
+
+
+class CaptureScheduler(Service):
+    @Signal
+    def capture_finished(self, address: str, latency: float) -> str: ...
+
+    def __init__(
+        self,
+        manager: Glace.Manager | None = None,
+        max_in_flight: int = 4,
+        **kwargs,
+    ):
+        self._manager = manager or Glace.Manager()
+        self._max_in_flight = max_in_flight
+
+        self._queue: list[tuple[int, int, str]] = []
+        self._counter = itertools.count()
+        # address -> (priority, callbacks), only entries in here are live
+        self._queued: dict[str, tuple[int, list[Callable]]] = {}
+        # address -> (start time, callbacks, timeout source)
+        self._in_flight: dict[str, tuple[float, list[Callable], int]] = {}
+
+        self._latencies: deque[float] = deque(maxlen=100)
+        self._completed = 0
+        self._coalesced = 0
+        self._cancelled = 0
+        self._failed = 0
+        super().__init__(**kwargs)
+
+    def request(
+        self,
+        address: str,
+        callback: Callable,
+        priority: int = PRIORITY_HIDDEN,
+    ):
+        if address in self._in_flight:
+            self._in_flight[address][1].append(callback)
+            self._coalesced += 1
+            return
+        if address in self._queued:
+            old_priority, callbacks = self._queued[address]
+            callbacks.append(callback)
+            self._coalesced += 1
+            if priority >= old_priority:
+                return
+            # Stale heap entry is skipped when popped
+            self._queued[address] = (priority, callbacks)
+        else:
+            self._queued[address] = (priority, [callback])
+        heapq.heappush(self._queue, (priority, next(self._counter), address))
+        self._pump()
+
+    def cancel(self, address: str):
+        if self._queued.pop(address, None) is not None:
+            self._cancelled += 1
+        if address in self._in_flight:
+            # The capture can't be aborted, drop its result instead
+            self._in_flight[address][1].clear()
+            self._cancelled += 1
+
+    def cancel_all(self):
+        for address in list(self._queued.keys()) + list(self._in_flight.keys()):
+            self.cancel(address)
+        self._queue.clear()
+
+    def _pump(self):
+        while self._queue and len(self._in_flight) < self._max_in_flight:
+            priority, _, address = heapq.heappop(self._queue)
+            entry = self._queued.get(address)
+            if entry is None or entry[0] != priority:
+                continue
+            del self._queued[address]
+            self._start_capture(address, entry[1])
+
+    def _start_capture(self, address: str, callbacks: list[Callable]):
+        timeout_source = GLib.timeout_add(
+            CAPTURE_TIMEOUT_MS, self._on_capture_timeout, address
+        )
+        self._in_flight[address] = (time.perf_counter(), callbacks, timeout_source)
+        try:
+            self._manager.capture_client_handle(
+                int(address, 16), False, self._on_captured, address
+            )
+        except Exception as e:
+            logger.error(f"[CaptureScheduler] Error capturing client {address}: {e}")
+            self._finish(address)
+            self._failed += 1
+
+    def _finish(self, address: str) -> tuple[float, list[Callable]] | None:
+        entry = self._in_flight.pop(address, None)
+        if entry is None:
+            return None
+        start, callbacks, timeout_source = entry
+        GLib.source_remove(timeout_source)
+        GLib.idle_add(self._pump)
+        return start, callbacks
+
+    def _on_captured(self, pixbuf, address: str):
+        entry = self._finish(address)
+        if entry is None:
+            return
+        start, callbacks = entry
+        latency = (time.perf_counter() - start) * 1000
+        self._latencies.append(latency)
+        self._completed += 1
+        for callback in callbacks:
+            callback(pixbuf, address)
+        self.capture_finished(address, latency)
+
+    def _on_capture_timeout(self, address: str):
+        entry = self._in_flight.pop(address, None)
+        if entry is not None:
+            logger.warning(f"[CaptureScheduler] Capture timed out for {address}")
+            self._failed += 1
+            self._pump()
+        return False
+
+    @Property(int, "readable")
+    def queue_depth(self) -> int:
+        return len(self._queued)
+
+    @Property(int, "readable")
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    @Property(float, "readable")
+    def average_latency(self) -> float:
+        return sum(self._latencies) / len(self._latencies) if self._latencies else 0.0
+
+    @Property(dict, "readable")
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "average_latency_ms": self.average_latency,
+            "max_latency_ms": max(self._latencies, default=0.0),
+            "completed": self._completed,
+            "coalesced": self._coalesced,
+            "cancelled": self._cancelled,
+            "failed": self._failed,
+        }
@@ -1,16 +1,29 @@
 import os
 import re
-import threading
 from typing import Callable
 
 import gi
-import magic
 from fabric import Fabricator, Property, Service, Signal
 from loguru import logger
 
+from fabric_config.utils.decode_pool import (
+    PRIORITY_HIDDEN,
+    PRIORITY_VISIBLE,
+    DecodePool,
+)
+from fabric_config.utils.lazy_import import lazy_import
+from fabric_config.utils.mime_sniff import sniff_mime_type
+from fabric_config.utils.thumbnail_cache import (
+    THUMBNAIL_SIZES,
+    ThumbnailCache,
+    hash_data,
+)
+
 gi.require_version("GdkPixbuf", "2.0")
 from gi.repository import GdkPixbuf, Gio, GLib
 
+magic = lazy_import("magic")
+
 SUPPORTED_MIME_TYPES = [
     mime_type for fmt in GdkPixbuf.Pixbuf.get_formats() for mime_type in fmt.mime_types
 ]
@@ -20,42 +33,41 @@ SUPPORTED_FILE_EXTENSIONS = [
     for file_extension in fmt.extensions
 ]
 
-# TODO: Assign a fixed number of image loading threads
-# TODO: make these cancelable
-
-
-def get_pixbuf_for_data_threaded(data: bytes, callback: Callable):
-    def thread_function():
-        try:
-            loader = GdkPixbuf.PixbufLoader()
-            loader.write(data)
-            loader.close()
-            pixbuf = loader.get_pixbuf()
-            GLib.idle_add(callback, (True, pixbuf))
-        except Exception as _:
-            logger.error("[CLIPBOARD] Failed make get loader for data")
-            GLib.idle_add(callback, (False, None))
-        finally:
-            GLib.idle_add(thread.join)
-
-    thread = threading.Thread(target=thread_function)
-    thread.start()
+BINARY_DATA_PATTERN = re.compile(r"\[\[ binary data .* \]\]")
+
+CLIPHIST_DB = os.environ.get(
+    "CLIPHIST_DB_PATH", str(GLib.get_user_cache_dir()) + "/cliphist/db"
+)
+# cliphist writes a copy in a few steps, they are handled as one change
+CHANGE_DEBOUNCE_MS = 30
+# A full list is only read when the newest entry doesn't follow the known ones,
+#   it waits for a burst of changes to settle
+RESYNC_DELAY_MS = 5000
+DECODE_WORKERS = 2
+# Decodes in flight, subprocess included. Entries past that wait their turn
+DECODE_MAX_PENDING = 64
+
+
+def is_supported_image(data: bytes) -> bool:
+    mime_type = sniff_mime_type(data)
+    if mime_type is None:
+        # Binary data without a known signature, rare enough for libmagic
+        detected = magic.detect_from_content(data)
+        return detected.mime_type in SUPPORTED_MIME_TYPES or "xbm image" in (
+            detected.name
+        )
+    return mime_type in SUPPORTED_MIME_TYPES
 
 
-def get_pixbuf_for_file_threaded(file_path: str, callback: Callable):
+def load_pixbuf_from_data(data: bytes) -> GdkPixbuf.Pixbuf:
+    loader = GdkPixbuf.PixbufLoader()
+    loader.write(data)
+    loader.close()
+    return loader.get_pixbuf()
 
-    def thread_function():
-        try:
-            pixbuf = GdkPixbuf.Pixbuf.new_from_file(file_path)
-            GLib.idle_add(callback, (True, pixbuf))
-        except Exception as _:
-            logger.error(f"[CLIPBOARD] Failed make pixbuf for file: {file_path}")
-            GLib.idle_add(callback, (False, None))
-        finally:
-            GLib.idle_add(thread.join)
 
-    thread = threading.Thread(target=thread_function)
-    thread.start()
+def load_pixbuf_from_file(file_path: str) -> GdkPixbuf.Pixbuf:
+    return GdkPixbuf.Pixbuf.new_from_file(file_path)
 
 
 class ClipboardHistory(Service):
@@ -65,32 +77,119 @@ class ClipboardHistory(Service):
     def clipboard_copied(self, cliphist_id: str) -> str: ...
     @Signal
     def clipboard_data_ready(self, cliphist_id: str) -> str: ...
-
-    def __init__(self, length_cutoff: int = 5000, file_max_size: int = 5000000):
+    @Signal
+    def item_added(self, cliphist_id: str) -> str: ...
+    @Signal
+    def item_removed(self, cliphist_id: str) -> str: ...
+
+    def __init__(
+        self,
+        length_cutoff: int = 5000,
+        file_max_size: int = 5000000,
+        thumbnail_size: int = THUMBNAIL_SIZES[-1],
+    ):
         self._length_cutoff = length_cutoff
         self._file_max_size = file_max_size
+        # Images are handed out as previews of this size, not at full size
+        self._thumbnail_size = thumbnail_size
+        self._thumbnails = ThumbnailCache()
         self._clipboard_history = {}
         self._decoded_clipboard_history = {}
-        super().__init__()
-        self.wl_paste_watcher = Fabricator(
-            poll_from="wl-paste --watch bash -c ' sleep 0.5 && echo '",
-            stream=True,
-            interval=-1,
+        # Ids with a decode in flight
+        self._decoding: set[str] = set()
+        # Ids waiting for a free decode slot
+        self._deferred: set[str] = set()
+        self._drain_source: int | None = None
+        # Ids shown on screen, their images are decoded first
+        self._visible: set[str] = set()
+        self._decode_pool = DecodePool(
+            workers=DECODE_WORKERS,
+            max_pending=DECODE_MAX_PENDING,
+            on_dropped=self._on_decode_dropped,
         )
-        self.wl_paste_watcher.connect("changed", lambda *_: self.cliphist_list())
+        self._change_source: int | None = None
+        self._resync_source: int | None = None
+        self._db_monitor: Gio.FileMonitor | None = None
+        self.wl_paste_watcher: Fabricator | None = None
+        super().__init__()
+
+        if os.path.exists(CLIPHIST_DB):
+            # Changes once `cliphist store` is done writing the new entry
+            self._db_monitor = Gio.File.new_for_path(CLIPHIST_DB).monitor_file(
+                Gio.FileMonitorFlags.NONE, None
+            )
+            self._db_monitor.connect("changed", self.on_db_changed)
+        else:
+            # No database yet, one long lived watcher without a shell per copy
+            self.wl_paste_watcher = Fabricator(
+                poll_from="wl-paste --watch echo",
+                stream=True,
+                interval=-1,
+            )
+            self.wl_paste_watcher.connect("changed", self.on_db_changed)
+        self.cliphist_list()
+
+    def on_db_changed(self, *args):
+        if len(args) == 4 and args[3] == Gio.FileMonitorEvent.ATTRIBUTE_CHANGED:
+            return
+        if self._change_source is None:
+            self._change_source = GLib.timeout_add(
+                CHANGE_DEBOUNCE_MS, self._on_change_settled
+            )
+
+    def _on_change_settled(self):
+        self._change_source = None
+        self.cliphist_newest()
+        return False
+
+    def queue_resync(self):
+        if self._resync_source is not None:
+            GLib.source_remove(self._resync_source)
+        self._resync_source = GLib.timeout_add(RESYNC_DELAY_MS, self._resync)
+
+    def _resync(self):
+        self._resync_source = None
+        self.cliphist_list()
+        return False
+
+    def cliphist_newest(self):
+        # Reads the first line of `cliphist list` and stops it there
+        process: Gio.Subprocess = Gio.Subprocess.new(
+            ["cliphist", "list"],
+            Gio.SubprocessFlags.STDOUT_PIPE | Gio.SubprocessFlags.STDERR_SILENCE,
+        )  # type: ignore
+        stream = Gio.DataInputStream.new(process.get_stdout_pipe())
+
+        def callback(stream: Gio.DataInputStream, task: Gio.Task):
+            try:
+                line, _ = stream.read_line_finish_utf8(task)
+            except Exception as _:
+                logger.error("[CLIPBOARD] Failed to read from `cliphist list`")
+                line = None
+            process.force_exit()
+            if not line or "\t" not in line:
+                self.queue_resync()
+                return
+            key, value = line.split("\t", 1)
+            self.apply_newest(key, value[7:] if value.startswith("file://") else value)
+
+        stream.read_line_async(GLib.PRIORITY_DEFAULT, None, callback)
 
     def cliphist_list(self):
         def callback(proc: Gio.Subprocess, task: Gio.Task):
             try:
                 _, stdout, stderr = proc.communicate_utf8_finish(task)
-                self._clipboard_history = {
+                history = {
                     key: value[7:] if value.startswith("file://") else value
                     for x in stdout.split("\n")[:-1]
                     for key, value in [x.split("\t", 1)]
                 }
-                self.notify("clipboard-history")
             except Exception as _:
                 logger.error("[CLIPBOARD] Failed to read from `cliphist list`")
+                return
+            # Also drops what was deleted or wiped while we were not running
+            self._thumbnails.prune(history)
+            self.apply_history(history)
 
         process: Gio.Subprocess = Gio.Subprocess.new(
             ["cliphist", "list"],
@@ -98,6 +197,138 @@ class ClipboardHistory(Service):
         )  # type: ignore
         process.communicate_utf8_async(None, None, callback)
 
+    def apply_history(self, history: dict):
+        # Only the difference to the previous snapshot is signalled and
+        #   decoded, entries that were already decoded are kept
+        previous = self._clipboard_history
+        # Ids are reused after a wipe, a different preview is a new entry
+        changed = [
+            key for key in history if key in previous and previous[key] != history[key]
+        ]
+        added = [key for key in history if key not in previous] + changed
+        removed = [key for key in previous if key not in history] + changed
+        self._clipboard_history = history
+
+        for cliphist_id in removed:
+            self._forget(cliphist_id)
+            self.item_removed(cliphist_id)
+        for cliphist_id in added:
+            self.item_added(cliphist_id)
+            self.decode_item(cliphist_id)
+        if added or removed:
+            self.notify("clipboard-history")
+
+    def apply_newest(self, cliphist_id: str, preview: str):
+        # A plain copy is the next id with a preview not seen yet. A known or
+        #   skipped id means entries were deleted, wiped or trimmed, and a
+        #   known preview may be a duplicate cliphist dropped the older copy of
+        if not self.follows_newest(cliphist_id) or (
+            preview in self._clipboard_history.values()
+        ):
+            self.queue_resync()
+        if cliphist_id in self._clipboard_history:
+            return
+        self.apply_history({cliphist_id: preview, **self._clipboard_history})
+
+    def follows_newest(self, cliphist_id: str) -> bool:
+        if not cliphist_id.isdigit():
+            return False
+        newest = max(
+            (int(key) for key in self._clipboard_history if key.isdigit()), default=0
+        )
+        return int(cliphist_id) == newest + 1 or not self._clipboard_history
+
+    def set_decoded(self, cliphist_id: str, data):
+        self._decode_done(cliphist_id)
+        # Deleted while it was being decoded
+        if cliphist_id not in self._clipboard_history:
+            return
+        self._decoded_clipboard_history[cliphist_id] = data
+        self.emit("clipboard-data-ready", cliphist_id)
+
+    def _forget(self, cliphist_id: str):
+        self._decoded_clipboard_history.pop(cliphist_id, None)
+        self._deferred.discard(cliphist_id)
+        self._decode_done(cliphist_id)
+        self._visible.discard(cliphist_id)
+        self._decode_pool.cancel(cliphist_id)
+        self._thumbnails.forget(cliphist_id)
+
+    def decode_pixbuf(self, cliphist_id: str, function: Callable, callback: Callable):
+        # Newest entries first, cliphist ids only ever grow
+        self._decode_pool.submit(
+            cliphist_id,
+            function,
+            callback,
+            priority=PRIORITY_VISIBLE
+            if cliphist_id in self._visible
+            else PRIORITY_HIDDEN,
+            order=-int(cliphist_id) if cliphist_id.isdigit() else 0,
+        )
+
+    def decode_thumbnail(
+        self,
+        cliphist_id: str,
+        digest_source: bytes,
+        load: Callable[[], GdkPixbuf.Pixbuf],
+        callback: Callable,
+    ):
+        # Hashing and the full decode both happen on the pool
+        preview = self._clipboard_history.get(cliphist_id, "")
+        self.decode_pixbuf(
+            cliphist_id,
+            lambda: self._thumbnails.create(
+                cliphist_id,
+                preview,
+                hash_data(digest_source),
+                load,
+                self._thumbnail_size,
+            ),
+            callback,
+        )
+
+    def set_visible_items(self, cliphist_ids: list[str]):
+        visible = set(cliphist_ids)
+        for cliphist_id in self._visible ^ visible:
+            self._decode_pool.set_priority(
+                cliphist_id,
+                PRIORITY_VISIBLE if cliphist_id in visible else PRIORITY_HIDDEN,
+            )
+        self._visible = visible
+        # Waiting entries that came into view are next once a slot frees up
+        for cliphist_id in visible:
+            if cliphist_id in self._clipboard_history:
+                self.decode_item(cliphist_id)
+
+    def _decode_done(self, cliphist_id: str):
+        self._decoding.discard(cliphist_id)
+        if self._deferred and self._drain_source is None:
+            self._drain_source = GLib.idle_add(self._drain_deferred)
+
+    def _on_decode_dropped(self, cliphist_id: str):
+        # Only happens if the pool is smaller than DECODE_MAX_PENDING
+        self._deferred.add(cliphist_id)
+        self._decode_done(cliphist_id)
+
+    def _drain_deferred(self):
+        self._drain_source = None
+        free = DECODE_MAX_PENDING - len(self._decoding)
+        if free <= 0:
+            return False
+        # Visible entries first, then the newest
+        waiting = sorted(
+            self._deferred,
+            key=lambda key: (
+                key not in self._visible,
+                -int(key) if key.isdigit() else 0,
+            ),
+        )
+        for cliphist_id in waiting[:free]:
+            self._deferred.discard(cliphist_id)
+            if cliphist_id in self._clipboard_history:
+                self.decode_item(cliphist_id)
+        return False
+
     def cliphist_decode(self, cliphist_id: str, callback: Callable):
         process = Gio.Subprocess.new(
             ["cliphist", "decode", str(cliphist_id)],
@@ -175,7 +406,15 @@ class ClipboardHistory(Service):
             out_stream.put_string(
                 f"{cliphist_id}\t{self._clipboard_history[cliphist_id]}\n", None
             )
+            # The next `cliphist list` will not see it as removed again
+            self._clipboard_history = {
+                key: value
+                for key, value in self._clipboard_history.items()
+                if key != cliphist_id
+            }
+            self._forget(cliphist_id)
             self.emit("clipboard-deleted", self.cliphist_id)
+            self.item_removed(cliphist_id)
         except Exception as _:
             logger.error(
                 f"[CLIPBOARD] Failed to delete item with cliphist id: {cliphist_id}"
@@ -188,36 +427,45 @@ class ClipboardHistory(Service):
         data_type = info[5]
         # image_dimensions = tuple(map(int, info[6].split("x")))
 
-        def callback(pixbuf_loader: GdkPixbuf.Pixbuf, task: Gio.Task):
-            try:
-                pixbuf = GdkPixbuf.Pixbuf.new_from_stream_finish(task)
-                self._decoded_clipboard_history[cliphist_id] = pixbuf
-                self.emit("clipboard-data-ready", cliphist_id)
+        def on_pixbuf_ready(results):
+            success, pixbuf = results
+            if success:
+                self.set_decoded(cliphist_id, pixbuf)
+            else:
+                self._decode_done(cliphist_id)
 
+        def callback(proc: Gio.Subprocess, task: Gio.Task):
+            try:
+                _, stdout, stderr = proc.communicate_finish(task)
+                data = stdout.get_data()
+                self.decode_thumbnail(
+                    cliphist_id,
+                    data,
+                    lambda: load_pixbuf_from_data(data),
+                    on_pixbuf_ready,
+                )
             except Exception as _:
+                self._decode_done(cliphist_id)
                 logger.error(
                     f"[CLIPBOARD] Failed to read pixbuf data from cliphist id: {cliphist_id}"
                 )
 
-        process: Gio.Subprocess = Gio.Subprocess.new(
-            ["cliphist", "decode", cliphist_id],
-            Gio.SubprocessFlags.STDOUT_PIPE | Gio.SubprocessFlags.STDERR_PIPE,
-        )  # type: ignore
-
         if data_type in SUPPORTED_FILE_EXTENSIONS:
-            GdkPixbuf.Pixbuf.new_from_stream_async(
-                process.get_stdout_pipe(), None, callback
-            )
+            self.cliphist_decode(cliphist_id, callback)
+        else:
+            self._decode_done(cliphist_id)
 
     def parse_html_tag(self, cliphist_id: str):
         def on_pixbuf_ready(loader, result):
             try:
-                self._decoded_clipboard_history[cliphist_id] = (
-                    GdkPixbuf.Pixbuf.new_from_stream_finish(result)
+                self.set_decoded(
+                    cliphist_id, GdkPixbuf.Pixbuf.new_from_stream_finish(result)
                 )
-                self.emit("clipboard-data-ready", cliphist_id)
             except Exception as e:
-                print(e)
+                self._decode_done(cliphist_id)
+                logger.error(
+                    f"[CLIPBOARD] Failed to load html image for cliphist id: {cliphist_id}: {e}"
+                )
 
         def on_file_read(stream: Gio.InputStream, task: Gio.Task, _):
             try:
@@ -227,6 +475,7 @@ class ClipboardHistory(Service):
                 )
                 input_stream.close_async(GLib.PRIORITY_DEFAULT, None, None)
             except Exception as _:
+                self._decode_done(cliphist_id)
                 logger.error(
                     f"[CLIPBOARD] Failed to download html image from cliphist id: {cliphist_id}"
                 )
@@ -246,6 +495,7 @@ class ClipboardHistory(Service):
                 )
 
             except Exception as _:
+                self._decode_done(cliphist_id)
                 logger.error(
                     f"[CLIPBOARD] Failed to decode html image for cliphist id: {cliphist_id}"
                 )
@@ -256,60 +506,64 @@ class ClipboardHistory(Service):
         decoded_string = ""
 
         def on_pixbuf_ready(results):
-            nonlocal decoded_string
-            try:
-                _, pbuf = results
-                self._decoded_clipboard_history[cliphist_id] = pbuf
-                self.emit("clipboard-data-ready", cliphist_id)
-            except Exception as _:
-                self._decoded_clipboard_history[cliphist_id] = decoded_string
-                self.emit("clipboard-data-ready", cliphist_id)
-                logger.error(f"[CLIPBOARD] Failed to read pixbuf for: {decoded_string}")
+            success, pbuf = results
+            if success:
+                return self.set_decoded(cliphist_id, pbuf)
+            logger.error(f"[CLIPBOARD] Failed to read pixbuf for: {cliphist_id}")
+            # Looked like an image but isn't one, shown as text instead
+            self.set_decoded(cliphist_id, decoded_string)
 
         def callback(proc: Gio.Subprocess, task: Gio.Task):
             nonlocal decoded_string
             try:
                 _, stdout, stderr = proc.communicate_finish(task)
-                decoded_string = str(stdout.get_data().decode("utf-8"))
+                data = stdout.get_data()
+                # Classified before the whole payload is decoded as text
+                if is_supported_image(data):
+                    # Only needed when loading it fails
+                    decoded_string = data[: self._length_cutoff * 4].decode(
+                        "utf-8", errors="replace"
+                    )[: self._length_cutoff]
+                    self.decode_thumbnail(
+                        cliphist_id,
+                        data,
+                        lambda: load_pixbuf_from_data(data),
+                        on_pixbuf_ready,
+                    )
+                    return
+
+                decoded_string = str(data.decode("utf-8"))
                 if decoded_string.startswith("file://"):
                     decoded_string = decoded_string[7:]
 
-                # TODO: find alternative for magic
-                stdout_contents_detect = magic.detect_from_content(stdout.get_data())
-                if (
-                    stdout_contents_detect.mime_type in SUPPORTED_MIME_TYPES
-                    or "xbm image" in stdout_contents_detect.name
-                ):
-                    get_pixbuf_for_data_threaded(stdout.get_data(), on_pixbuf_ready)
-                    return
-
-                elif not os.path.exists(decoded_string):
-                    self._decoded_clipboard_history[cliphist_id] = decoded_string[
-                        : self._length_cutoff
-                    ]
-                    self.emit("clipboard-data-ready", cliphist_id)
+                if not os.path.exists(decoded_string):
+                    self.set_decoded(
+                        cliphist_id, decoded_string[: self._length_cutoff]
+                    )
                     return
 
                 f = Gio.file_new_for_path(decoded_string)
                 info = f.query_info(
-                    "thumbnail::*,standard::size,standard::content-type",
+                    "thumbnail::*,standard::size,standard::content-type,time::modified",
                     Gio.FileQueryInfoFlags.NONE,
                     None,
                 )  # type: ignore
 
                 if info.get_attribute_boolean("thumbnail::is-valid-large"):
-                    get_pixbuf_for_file_threaded(
-                        info.get_attribute_as_string("thumbnail::path-large"),
-                        on_pixbuf_ready,
+                    path = info.get_attribute_as_string("thumbnail::path-large")
+                    self.decode_pixbuf(
+                        cliphist_id, lambda: load_pixbuf_from_file(path), on_pixbuf_ready
                     )
                     return
                 elif info.get_attribute_boolean("thumbnail::is-valid"):
-                    get_pixbuf_for_file_threaded(
-                        info.get_attribute_as_string("thumbnail::path"), on_pixbuf_ready
+                    path = info.get_attribute_as_string("thumbnail::path")
+                    self.decode_pixbuf(
+                        cliphist_id, lambda: load_pixbuf_from_file(path), on_pixbuf_ready
                     )
                     return
-                # 5MB limit
+                # 5MB limit, shown as the path
                 if info.get_size() > self._file_max_size:
+                    self.set_decoded(cliphist_id, decoded_string)
                     return
 
                 # FIXME: python 3.13 introduced a new function guess_file_type, use that
@@ -317,27 +571,78 @@ class ClipboardHistory(Service):
                 # detected_filename = magic.detect_from_filename(decoded_string)
                 file_type = info.get_content_type()
                 if file_type in SUPPORTED_MIME_TYPES:
-                    get_pixbuf_for_file_threaded(decoded_string, on_pixbuf_ready)
+                    # A changed file gets a new thumbnail
+                    file_key = "\0".join(
+                        [
+                            decoded_string,
+                            str(info.get_size()),
+                            str(info.get_attribute_uint64("time::modified")),
+                        ]
+                    )
+                    self.decode_thumbnail(
+                        cliphist_id,
+                        file_key.encode(),
+                        lambda: load_pixbuf_from_file(decoded_string),
+                        on_pixbuf_ready,
+                    )
                 else:
-                    self._decoded_clipboard_history[cliphist_id] = decoded_string
-                    self.emit("clipboard-data-ready", cliphist_id)
+                    self.set_decoded(cliphist_id, decoded_string)
 
             except Exception as e:
-                print(e)
+                self._decode_done(cliphist_id)
+                logger.error(
+                    f"[CLIPBOARD] Failed to decode cliphist id: {cliphist_id}: {e}"
+                )
 
         self.cliphist_decode(cliphist_id, callback)
 
+    def decode_item(self, cliphist_id: str):
+        if (
+            cliphist_id in self._decoded_clipboard_history
+            or cliphist_id in self._decoding
+        ):
+            return
+        # Back-pressure, also bounds the number of cliphist subprocesses
+        if len(self._decoding) >= DECODE_MAX_PENDING:
+            self._deferred.add(cliphist_id)
+            return
+        self._deferred.discard(cliphist_id)
+        self._decoding.add(cliphist_id)
+
+        # Decoded on an earlier run, no subprocess and no full decode
+        thumbnail_path = self._thumbnails.lookup(
+            cliphist_id, self._clipboard_history[cliphist_id], self._thumbnail_size
+        )
+        if thumbnail_path:
+            return self.decode_pixbuf(
+                cliphist_id,
+                lambda: load_pixbuf_from_file(thumbnail_path),
+                lambda results: self.on_cached_thumbnail(cliphist_id, results),
+            )
+        self.parse_item(cliphist_id)
+
+    def on_cached_thumbnail(self, cliphist_id: str, results: tuple):
+        success, pixbuf = results
+        if success:
+            return self.set_decoded(cliphist_id, pixbuf)
+        # Evicted in the meantime
+        self._thumbnails.forget(cliphist_id)
+        self.parse_item(cliphist_id)
+
+    def parse_item(self, cliphist_id: str):
+        preview: str = self._clipboard_history[cliphist_id]
+
+        if BINARY_DATA_PATTERN.match(preview):
+            self.parse_data_binary(cliphist_id)
+        elif preview.startswith("<meta"):
+            self.parse_html_tag(cliphist_id)
+        else:
+            self.parse_string(cliphist_id)
+
     def decode_clipboard(self):
-        pattern = re.compile("\[\[ binary data .* \]\]")
-        for cliphist_id in self._clipboard_history.keys():
-            preview: str = self._clipboard_history[cliphist_id]
-
-            if pattern.match(preview):
-                self.parse_data_binary(cliphist_id)
-            elif preview.startswith("<meta"):
-                self.parse_html_tag(cliphist_id)
-            else:
-                self.parse_string(cliphist_id)
+        # Entries already decoded or being decoded are skipped
+        for cliphist_id in list(self._clipboard_history.keys()):
+            self.decode_item(cliphist_id)
 
     @Property(dict, "readable")
     def clipboard_history(self) -> dict:
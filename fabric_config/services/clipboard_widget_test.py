@@ -6,9 +6,10 @@ from fabric.widgets.button import Button
 from fabric.widgets.wayland import WaylandWindow
 from fabric.widgets.label import Label
 from fabric.widgets.image import Image
+from fabric.widgets.scrolledwindow import ScrolledWindow
 
 gi.require_version("GdkPixbuf", "2.0")
-from gi.repository import GdkPixbuf
+from gi.repository import GdkPixbuf, GLib
 
 
 class ClipboardHistoryItem(Box):
@@ -50,17 +51,45 @@ class ClipboardHistoryItem(Box):
         # self.destroy()
 
 
-class ClipboardHistoryBox(Box):
+class ClipboardHistoryBox(ScrolledWindow):
     def __init__(self):
         self.child_dict = {}
-        super().__init__(orientation="v", spacing=10, size=100)
+        self._visible_source: int | None = None
+        self.items_box = Box(orientation="v", spacing=10, size=100)
+        super().__init__(
+            min_content_size=(-1, 600),
+            max_content_size=(-1, 600),
+            propagate_width=True,
+            child=self.items_box,
+        )
+        # Images of the entries on screen are decoded first
+        self.get_vadjustment().connect("value-changed", self.queue_visible_update)
+        self.items_box.connect("size-allocate", self.queue_visible_update)
         self.ch_service = ClipboardHistory()
-        self.ch_service.connect("notify::clipboard-history", self.on_new_clipboard)
-        self.ch_service.connect("clipboard-deleted", self.on_clipboard_delete)
+        self.ch_service.connect("item-added", self.on_clipboard_added)
+        self.ch_service.connect("item-removed", self.on_clipboard_delete)
         self.ch_service.connect("clipboard-data-ready", self.on_clipboard_decoded)
         # self.ch_service.connect("clipboard-copied", self.on_clipboard_copied)
 
+    def queue_visible_update(self, *_):
+        if self._visible_source is None:
+            self._visible_source = GLib.idle_add(self.update_visible_items)
+
+    def update_visible_items(self):
+        self._visible_source = None
+        top = self.get_vadjustment().get_value()
+        bottom = top + self.get_allocated_height()
+        visible = []
+        for clipboard_id, item in self.child_dict.items():
+            allocation = item.get_allocation()
+            if allocation.y < bottom and allocation.y + allocation.height > top:
+                visible.append(clipboard_id)
+        self.ch_service.set_visible_items(visible)
+        return False
+
     def on_clipboard_decoded(self, _, clipboard_id: str):
+        if clipboard_id not in self.child_dict:
+            return
         self.child_dict[clipboard_id].update_clipbaord_child_pixbuf(
             self.ch_service.decoded_clipboard_history[clipboard_id]
         )
@@ -69,18 +98,17 @@ class ClipboardHistoryBox(Box):
         pass
 
     def on_clipboard_delete(self, _, clipboard_id: str):
-        self.child_dict.pop(clipboard_id).destroy()
-
-    def on_new_clipboard(self, *_):
-        self.child_dict.clear()
-        for child in self.children:
-            child.destroy()
-        for key in self.ch_service.clipboard_history.keys():
-            item = ClipboardHistoryItem(key, self.ch_service)
-            self.child_dict[key] = item
-            self.add(item)
-
-        self.ch_service.decode_clipboard()
+        item = self.child_dict.pop(clipboard_id, None)
+        item.destroy() if item else None
+
+    def on_clipboard_added(self, _, clipboard_id: str):
+        # Same order as `cliphist list`, newest first
+        item = ClipboardHistoryItem(clipboard_id, self.ch_service)
+        self.child_dict[clipboard_id] = item
+        self.items_box.add(item)
+        self.items_box.reorder_child(
+            item, list(self.ch_service.clipboard_history).index(clipboard_id)
+        )
 
 
 app = Application()
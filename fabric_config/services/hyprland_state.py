@@ -0,0 +1,322 @@
+import json
+import threading
+
+from fabric.core.service import Property, Service, Signal
+from fabric.hyprland.service import Hyprland, HyprlandEvent
+from gi.repository import GLib
+from loguru import logger
+
+# Event sourced view of the compositor
+#   One snapshot is taken on startup, from then on the state is kept current by
+#   applying events from the hyprland event socket. Consumers only ever read
+#   from memory. Window geometry is not part of any event, so those fields are
+#   refreshed by a single debounced `j/clients` call off the main thread.
+
+REFRESH_DEBOUNCE_MS = 50
+
+
+def normalize_address(address: str) -> str:
+    # Events send the address without the 0x prefix, `j/clients` includes it
+    return address if address.startswith("0x") else f"0x{address}"
+
+
+class HyprlandState(Service):
+    @Signal
+    def client_added(self, address: str) -> str: ...
+
+    @Signal
+    def client_removed(self, address: str) -> str: ...
+
+    @Signal
+    def client_changed(self, address: str) -> str: ...
+
+    @Signal
+    def monitors_changed(self) -> None: ...
+
+    @Signal
+    def active_workspace_changed(self) -> None: ...
+
+    def __init__(self, **kwargs):
+        self._clients: dict[str, dict] = {}
+        self._workspaces: dict[int, dict] = {}
+        self._monitors: dict[int, dict] = {}
+        self._active_workspace: dict = {}
+        self._focused_monitor: str = ""
+        self._active_client: str = ""
+
+        self._refresh_source: int | None = None
+        self._refresh_running = False
+        self._refresh_pending = False
+
+        super().__init__(**kwargs)
+        self._connection = Hyprland()
+        self.sync()
+
+        for event_name, handler in {
+            "openwindow": self.on_open_window,
+            "closewindow": self.on_close_window,
+            "movewindowv2": self.on_move_window,
+            "windowtitlev2": self.on_window_title,
+            "activewindowv2": self.on_active_window,
+            "changefloatingmode": self.on_geometry_changed,
+            "fullscreen": self.on_geometry_changed,
+            "workspacev2": self.on_workspace,
+            "focusedmon": self.on_focused_monitor,
+            "createworkspacev2": self.on_create_workspace,
+            "destroyworkspacev2": self.on_destroy_workspace,
+            "moveworkspacev2": self.on_move_workspace,
+            "renameworkspace": self.on_rename_workspace,
+            "monitoradded": self.on_monitors_changed,
+            "monitorremoved": self.on_monitors_changed,
+        }.items():
+            self._connection.connect(f"event::{event_name}", handler)
+
+    # Snapshot
+    def sync(self):
+        # Blocking, only meant for startup
+        self.sync_topology()
+        try:
+            self._clients = {
+                client["address"]: client for client in self._request("j/clients")
+            }
+        except Exception as e:
+            logger.error(f"[HyprlandState] Failed to read clients: {e}")
+
+    def sync_topology(self):
+        # Blocking, only used on startup and monitor hotplug
+        try:
+            self._monitors = {
+                monitor["id"]: monitor for monitor in self._request("j/monitors")
+            }
+            self._workspaces = {
+                workspace["id"]: workspace
+                for workspace in self._request("j/workspaces")
+            }
+            self._active_workspace = self._request("j/activeworkspace")
+            self._focused_monitor = self._active_workspace.get("monitor", "")
+        except Exception as e:
+            logger.error(f"[HyprlandState] Failed to read monitors: {e}")
+
+    def _request(self, command: str):
+        return json.loads(self._connection.send_command(command).reply.decode())
+
+    # Geometry refresh
+    def queue_clients_refresh(self):
+        if self._refresh_source is not None:
+            return
+        self._refresh_source = GLib.timeout_add(
+            REFRESH_DEBOUNCE_MS, self._do_clients_refresh
+        )
+
+    def _do_clients_refresh(self):
+        self._refresh_source = None
+        if self._refresh_running:
+            self._refresh_pending = True
+            return False
+        self._refresh_running = True
+
+        def thread_function():
+            try:
+                clients = self._request("j/clients")
+            except Exception as e:
+                logger.error(f"[HyprlandState] Failed to refresh clients: {e}")
+                clients = None
+            GLib.idle_add(self._apply_clients_refresh, clients)
+
+        threading.Thread(target=thread_function, daemon=True).start()
+        return False
+
+    def _apply_clients_refresh(self, clients: list | None):
+        self._refresh_running = False
+        if clients is not None:
+            fresh = {client["address"]: client for client in clients}
+            for address in [a for a in self._clients if a not in fresh]:
+                self._remove_client(address)
+            for address, client in fresh.items():
+                if address not in self._clients:
+                    self._clients[address] = client
+                    self.client_added(address)
+                elif self._clients[address] != client:
+                    self._clients[address] = client
+                    self.client_changed(address)
+        if self._refresh_pending:
+            self._refresh_pending = False
+            self.queue_clients_refresh()
+        return False
+
+    # Helpers
+    def _remove_client(self, address: str):
+        if self._clients.pop(address, None) is not None:
+            self.client_removed(address)
+
+    def _get_workspace_by_name(self, name: str) -> dict | None:
+        for workspace in self._workspaces.values():
+            if workspace["name"] == name:
+                return workspace
+        return None
+
+    def _get_monitor_by_name(self, name: str) -> dict | None:
+        for monitor in self._monitors.values():
+            if monitor["name"] == name:
+                return monitor
+        return None
+
+    def _set_active_workspace(self, workspace: dict | None):
+        if not workspace or workspace == self._active_workspace:
+            return
+        self._active_workspace = workspace
+        self._focused_monitor = workspace.get("monitor", self._focused_monitor)
+        monitor = self._get_monitor_by_name(self._focused_monitor)
+        if monitor:
+            monitor["activeWorkspace"] = {
+                "id": workspace["id"],
+                "name": workspace["name"],
+            }
+        self.active_workspace_changed()
+
+    # Client events
+    def on_open_window(self, _, event: HyprlandEvent):
+        # openwindow>>ADDRESS,WORKSPACENAME,CLASS,TITLE
+        address = normalize_address(event.data[0])
+        workspace = self._get_workspace_by_name(event.data[1]) or {
+            "id": -1,
+            "name": event.data[1],
+        }
+        self._clients[address] = {
+            "address": address,
+            "workspace": {"id": workspace["id"], "name": workspace["name"]},
+            "monitor": workspace.get("monitorID", -1),
+            "class": event.data[2],
+            "initialClass": event.data[2],
+            "title": ",".join(event.data[3:]),
+            "at": [0, 0],
+            "size": [0, 0],
+        }
+        self.client_added(address)
+        # Geometry is not part of the event
+        self.queue_clients_refresh()
+
+    def on_close_window(self, _, event: HyprlandEvent):
+        self._remove_client(normalize_address(event.data[0]))
+        self.queue_clients_refresh()
+
+    def on_move_window(self, _, event: HyprlandEvent):
+        # movewindowv2>>ADDRESS,WORKSPACEID,WORKSPACENAME
+        address = normalize_address(event.data[0])
+        if address in self._clients:
+            workspace_id = int(event.data[1])
+            self._clients[address]["workspace"] = {
+                "id": workspace_id,
+                "name": ",".join(event.data[2:]),
+            }
+            if workspace_id in self._workspaces:
+                self._clients[address]["monitor"] = self._workspaces[
+                    workspace_id
+                ].get("monitorID", self._clients[address]["monitor"])
+            self.client_changed(address)
+        # Tiling reflows every window on both workspaces
+        self.queue_clients_refresh()
+
+    def on_window_title(self, _, event: HyprlandEvent):
+        # windowtitlev2>>ADDRESS,TITLE
+        address = normalize_address(event.data[0])
+        if address in self._clients:
+            self._clients[address]["title"] = ",".join(event.data[1:])
+            self.client_changed(address)
+
+    def on_active_window(self, _, event: HyprlandEvent):
+        self._active_client = (
+            normalize_address(event.data[0]) if event.data and event.data[0] else ""
+        )
+
+    def on_geometry_changed(self, *_):
+        self.queue_clients_refresh()
+
+    # Workspace events
+    def on_workspace(self, _, event: HyprlandEvent):
+        # workspacev2>>ID,NAME
+        self._set_active_workspace(self._workspaces.get(int(event.data[0])))
+
+    def on_focused_monitor(self, _, event: HyprlandEvent):
+        # focusedmon>>MONNAME,WORKSPACENAME
+        self._focused_monitor = event.data[0]
+        workspace = self._get_workspace_by_name(",".join(event.data[1:]))
+        if workspace:
+            self._set_active_workspace(workspace)
+        else:
+            self.active_workspace_changed()
+
+    def on_create_workspace(self, _, event: HyprlandEvent):
+        # createworkspacev2>>ID,NAME
+        workspace_id = int(event.data[0])
+        monitor = self._get_monitor_by_name(self._focused_monitor)
+        self._workspaces[workspace_id] = {
+            "id": workspace_id,
+            "name": ",".join(event.data[1:]),
+            "monitor": self._focused_monitor,
+            "monitorID": monitor["id"] if monitor else -1,
+            "windows": 0,
+        }
+
+    def on_destroy_workspace(self, _, event: HyprlandEvent):
+        # destroyworkspacev2>>ID,NAME
+        self._workspaces.pop(int(event.data[0]), None)
+
+    def on_move_workspace(self, _, event: HyprlandEvent):
+        # moveworkspacev2>>ID,NAME,MONNAME
+        workspace = self._workspaces.get(int(event.data[0]))
+        monitor = self._get_monitor_by_name(event.data[-1])
+        if not workspace or not monitor:
+            return
+        workspace["monitor"] = monitor["name"]
+        workspace["monitorID"] = monitor["id"]
+        for address, client in self._clients.items():
+            if client["workspace"]["id"] == workspace["id"]:
+                client["monitor"] = monitor["id"]
+                self.client_changed(address)
+        self.queue_clients_refresh()
+
+    def on_rename_workspace(self, _, event: HyprlandEvent):
+        # renameworkspace>>ID,NEWNAME
+        workspace = self._workspaces.get(int(event.data[0]))
+        if workspace:
+            workspace["name"] = ",".join(event.data[1:])
+
+    # Monitor events
+    def on_monitors_changed(self, *_):
+        # Hotplug is rare, a resync keeps every id consistent
+        self.sync_topology()
+        self.monitors_changed()
+        self.active_workspace_changed()
+        self.queue_clients_refresh()
+
+    # Accessors
+    def get_client(self, address: str) -> dict | None:
+        return self._clients.get(normalize_address(address))
+
+    def get_monitor(self, monitor_id: int) -> dict | None:
+        return self._monitors.get(monitor_id)
+
+    @Property(dict, "readable")
+    def clients(self) -> dict:
+        return self._clients
+
+    @Property(dict, "readable")
+    def workspaces(self) -> dict:
+        return self._workspaces
+
+    @Property(dict, "readable")
+    def monitors(self) -> dict:
+        return self._monitors
+
+    @Property(dict, "readable")
+    def active_workspace(self) -> dict:
+        return self._active_workspace
+
+    @Property(str, "readable")
+    def focused_monitor(self) -> str:
+        return self._focused_monitor
+
+    @Property(str, "readable")
+    def active_client(self) -> str:
+        return self._active_client
@@ -0,0 +1,70 @@
+import warnings
+
+import gi
+from fabric.core.service import Property, Service, Signal
+from loguru import logger
+
+from fabric_config.services.hyprland_state import HyprlandState
+
+gi.require_version("Gdk", "3.0")
+from gi.repository import Gdk
+
+# Hyprland names monitors by plug name, Gdk by index. The map between the two
+#   is rebuilt only when either side reports a hotplug, and the focused
+#   monitor follows the focus events HyprlandState already receives, so
+#   resolving the monitor of a popup costs a dict lookup.
+
+
+class MonitorTracker(Service):
+    @Signal
+    def monitors_changed(self) -> None: ...
+
+    @Signal
+    def focused_monitor_changed(self) -> None: ...
+
+    def __init__(self, hyprland_state: HyprlandState, **kwargs):
+        self._state = hyprland_state
+        self._display: Gdk.Display = Gdk.Display.get_default()
+        # plug name -> Gdk monitor index
+        self._gdk_ids: dict[str, int] = {}
+        self._focused_gdk_monitor: int | None = None
+        super().__init__(**kwargs)
+
+        self.rebuild()
+        hyprland_state.connect("active-workspace-changed", self.on_focus_changed)
+        hyprland_state.connect("monitors-changed", self.rebuild)
+        # Gdk may learn about a monitor after hyprland announced it
+        self._display.connect("monitor-added", self.rebuild)
+        self._display.connect("monitor-removed", self.rebuild)
+
+    def rebuild(self, *_):
+        screen = self._display.get_default_screen()
+        with warnings.catch_warnings():
+            # Gdk.Screen.get_monitor_plug_name is deprecated, but it is the
+            #   only name Gtk 3 has that matches hyprland's
+            warnings.simplefilter("ignore", DeprecationWarning)
+            self._gdk_ids = {
+                screen.get_monitor_plug_name(i): i
+                for i in range(self._display.get_n_monitors())
+            }
+        logger.info(f"[MonitorTracker] Monitors: {self._gdk_ids}")
+        self.monitors_changed()
+        self.on_focus_changed()
+
+    def on_focus_changed(self, *_):
+        focused = self._gdk_ids.get(self._state.focused_monitor)
+        if focused == self._focused_gdk_monitor:
+            return
+        self._focused_gdk_monitor = focused
+        self.focused_monitor_changed()
+
+    def get_gdk_monitor_id(self, plug_name: str) -> int | None:
+        return self._gdk_ids.get(plug_name)
+
+    @Property(object, "readable")
+    def focused_gdk_monitor(self) -> int | None:
+        return self._focused_gdk_monitor
+
+    @Property(dict, "readable")
+    def gdk_monitor_ids(self) -> dict:
+        return self._gdk_ids
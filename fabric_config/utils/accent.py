@@ -1,10 +1,13 @@
 from typing import Callable
-from colorthief import ColorThief
 import threading
 
 from loguru import logger
 from gi.repository import GLib
 
+from fabric_config.utils.lazy_import import lazy_import
+
+colorthief = lazy_import("colorthief")
+
 
 def grab_accent_color_threaded(
     image_path: str,
@@ -13,7 +16,7 @@ def grab_accent_color_threaded(
 ):
     def thread_function():
         try:
-            ct = ColorThief(file=image_path).get_color(quality)
+            ct = colorthief.ColorThief(file=image_path).get_color(quality)
             GLib.idle_add(callback, ct)
         except Exception:
             logger.error("[COLORS] Failed to grab an accent color")
@@ -26,5 +29,5 @@ def grab_accent_color_threaded(
 
 
 def grab_color(image_path: str, n: int):
-    c_t = ColorThief(image_path)
+    c_t = colorthief.ColorThief(image_path)
     return c_t.get_color(n)
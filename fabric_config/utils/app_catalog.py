@@ -0,0 +1,216 @@
+import json
+import os
+import threading
+
+import gi
+
+gi.require_version("Gtk", "3.0")
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import GdkPixbuf, Gio, GLib, Gtk
+from loguru import logger
+
+from fabric_config.utils.icon_resolver import DesktopFileIndex
+from fabric_config.utils.json_store import DebouncedJsonWriter
+
+CACHE_DIR = str(GLib.get_user_cache_dir()) + "/fabric"
+APP_CATALOG_FILE = CACHE_DIR + "/app_catalog.json"
+# Bump when the stored fields change, older catalogs are then rebuilt
+APP_CATALOG_VERSION = 1
+APP_CATALOG_SAVE_DELAY_MS = 2000
+if not os.path.exists(CACHE_DIR):
+    os.makedirs(CACHE_DIR)
+
+
+def stat_signature(path: str) -> list[int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def list_desktop_files(data_dir: str) -> list[str]:
+    try:
+        return [
+            data_dir + file_name
+            for file_name in os.listdir(data_dir)
+            if file_name.endswith(".desktop")
+        ]
+    except OSError:
+        return []
+
+
+def serialize_app_info(app_info: Gio.DesktopAppInfo) -> dict:
+    icon = app_info.get_icon()
+    return {
+        "path": app_info.get_filename(),
+        "name": app_info.get_name(),
+        "display_name": app_info.get_display_name(),
+        "generic_name": app_info.get_generic_name(),
+        "description": app_info.get_description(),
+        "executable": app_info.get_executable(),
+        "command_line": app_info.get_commandline(),
+        "icon_name": icon.to_string() if icon else None,
+        "keywords": list(app_info.get_keywords() or []),
+    }
+
+
+# Same attributes the launcher reads from fabric's DesktopApp, filled from the
+#   catalog. The Gio.DesktopAppInfo is only parsed if something asks for it.
+class CatalogApp:
+    def __init__(
+        self, desktop_id: str, fields: dict, app_info: Gio.DesktopAppInfo | None = None
+    ):
+        self.desktop_id = desktop_id
+        self.path: str = fields["path"]
+        self.name: str = fields["name"]
+        self.display_name: str | None = fields.get("display_name")
+        self.generic_name: str | None = fields.get("generic_name")
+        self.description: str | None = fields.get("description")
+        self.executable: str | None = fields.get("executable")
+        self.command_line: str | None = fields.get("command_line")
+        self.icon_name: str | None = fields.get("icon_name")
+        self.keywords: list[str] = fields.get("keywords") or []
+        self._app_info = app_info
+
+    @property
+    def app_info(self) -> Gio.DesktopAppInfo | None:
+        if self._app_info is None:
+            self._app_info = Gio.DesktopAppInfo.new_from_filename(self.path)
+        return self._app_info
+
+    def get_icon_pixbuf(
+        self,
+        size: int = 48,
+        default_icon: str | None = "image-missing",
+        flags: Gtk.IconLookupFlags = Gtk.IconLookupFlags.FORCE_SIZE,
+    ) -> GdkPixbuf.Pixbuf | None:
+        icon_theme = Gtk.IconTheme.get_default()
+        try:
+            if self.icon_name and os.path.isabs(self.icon_name):
+                return GdkPixbuf.Pixbuf.new_from_file_at_size(self.icon_name, size, size)
+            return icon_theme.load_icon(self.icon_name or default_icon, size, flags)
+        except GLib.Error:
+            if not default_icon:
+                return None
+            try:
+                return icon_theme.load_icon(default_icon, size, flags)
+            except GLib.Error:
+                return None
+
+    def launch(self):
+        app_info = self.app_info
+        return app_info.launch() if app_info else None
+
+
+# Parsed applications plus the stat signature of every desktop file and
+#   applications dir they came from. A warm start is one json read; the
+#   signatures are then compared off the main thread to find what changed.
+class AppCatalog:
+    def __init__(self, path: str = APP_CATALOG_FILE):
+        self.path = path
+        # desktop id -> serialized app, only the ones that should be shown
+        self._apps: dict[str, dict] = {}
+        # desktop file path / applications dir -> [mtime_ns, size]
+        self._files: dict[str, list[int]] = {}
+        self._dirs: dict[str, list[int]] = {}
+        self._lock = threading.Lock()
+        self._writer = DebouncedJsonWriter(
+            path,
+            self._snapshot,
+            delay_ms=APP_CATALOG_SAVE_DELAY_MS,
+            log_tag="AppCatalog",
+        )
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            logger.info("[AppCatalog] Cache file is corrupted, rebuilding")
+            return False
+        if data.get("version") != APP_CATALOG_VERSION or data.get(
+            "dirs", {}
+        ).keys() != set(DesktopFileIndex.get_application_dirs()):
+            # XDG_DATA_DIRS changed since the catalog was written
+            return False
+        self._apps = data["apps"]
+        self._files = data["files"]
+        self._dirs = data["dirs"]
+        return True
+
+    def scan(self):
+        self._apps = {
+            app_info.get_id(): serialize_app_info(app_info)
+            for app_info in Gio.DesktopAppInfo.get_all()
+            if app_info.should_show()
+        }
+        self._dirs = {}
+        self._files = {}
+        for data_dir in DesktopFileIndex.get_application_dirs():
+            self._dirs[data_dir] = stat_signature(data_dir)
+            for path in list_desktop_files(data_dir):
+                self._files[path] = stat_signature(path)
+        for app in self._apps.values():
+            # Desktop files in subdirectories are not listed above
+            self._files.setdefault(app["path"], stat_signature(app["path"]))
+
+    def get_apps(self) -> dict[str, CatalogApp]:
+        return {
+            desktop_id: CatalogApp(desktop_id, fields)
+            for desktop_id, fields in self._apps.items()
+        }
+
+    def find_changes(self) -> set[str]:
+        # Only stats, safe to run on a worker thread
+        with self._lock:
+            files = dict(self._files)
+            dirs = dict(self._dirs)
+        changed = {
+            path for path, signature in files.items() if stat_signature(path) != signature
+        }
+        for data_dir, signature in dirs.items():
+            # Files were added or removed, the listing tells which
+            if stat_signature(data_dir) != signature:
+                changed.update(
+                    path for path in list_desktop_files(data_dir) if path not in files
+                )
+        return changed
+
+    def update_file(self, path: str):
+        with self._lock:
+            signature = stat_signature(path)
+            if signature is None:
+                self._files.pop(path, None)
+            else:
+                self._files[path] = signature
+            data_dir = os.path.dirname(path) + "/"
+            if data_dir in self._dirs:
+                self._dirs[data_dir] = stat_signature(data_dir)
+
+    def set_app(
+        self, desktop_id: str, app_info: Gio.DesktopAppInfo | None
+    ) -> CatalogApp | None:
+        if app_info is None:
+            self._apps.pop(desktop_id, None)
+            return None
+        fields = serialize_app_info(app_info)
+        self._apps[desktop_id] = fields
+        return CatalogApp(desktop_id, fields, app_info)
+
+    def _snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "version": APP_CATALOG_VERSION,
+                "apps": dict(self._apps),
+                "files": dict(self._files),
+                "dirs": dict(self._dirs),
+            }
+
+    def queue_save(self):
+        self._writer.queue()
+
+    def save(self, blocking: bool = False):
+        self._writer.write_now(blocking)
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import heapq
+import os
+import re
+import time
+from collections import Counter
+from itertools import chain
+from typing import TYPE_CHECKING, Callable
+
+from fabric_config.utils.lazy_import import lazy_import
+
+if TYPE_CHECKING:
+    from fabric_config.utils.app_catalog import CatalogApp
+
+# Loaded on the first keystroke
+fuzz = lazy_import("thefuzz.fuzz")
+
+# Built once per application list, each keystroke then only scores the
+#   candidates found through the prefix table (a flattened trie of every
+#   token) and the trigram index, instead of every application.
+
+# Fuzzy scoring runs on at most MAX_CANDIDATES apps, prefix matches may take
+#   all but TRIGRAM_CANDIDATES of them
+MAX_CANDIDATES = 40
+TRIGRAM_CANDIDATES = 10
+PREFIX_BONUS = 20
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in re.split(r"[\s\-_.]+", text.lower()) if token]
+
+
+def trigrams(text: str) -> set[str]:
+    text = "".join(text.lower().split())
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def get_search_fields(app: CatalogApp) -> list[str]:
+    fields = [
+        app.name,
+        app.display_name,
+        app.generic_name,
+        os.path.basename(app.executable) if app.executable else None,
+    ]
+    fields.extend(getattr(app, "keywords", None) or [])
+    return [field for field in fields if field]
+
+
+class AppSearchIndex:
+    def __init__(self, applications: list[CatalogApp] | None = None):
+        self._apps: list[CatalogApp] = []
+        self._names: list[str] = []
+        # id(app) -> slot, apps don't have to be hashable
+        self._positions: dict[int, int] = {}
+        self._prefixes: dict[str, set[int]] = {}
+        self._trigrams: dict[str, set[int]] = {}
+        # Milliseconds spent in the last call to search
+        self.last_search_time = 0.0
+        self.build(applications or [])
+
+    def build(self, applications: list[CatalogApp]):
+        self._apps = []
+        self._names = []
+        self._positions = {}
+        self._prefixes.clear()
+        self._trigrams.clear()
+        for app in applications:
+            self.add(app)
+
+    def add(self, app: CatalogApp):
+        if id(app) in self._positions:
+            return
+        i = self._positions[id(app)] = len(self._apps)
+        self._apps.append(app)
+        self._names.append(app.name.lower())
+        self._index_app(i, app)
+
+    def remove(self, app: CatalogApp):
+        # The slot is left empty, it is never reached through the indexes again
+        i = self._positions.pop(id(app), None)
+        if i is None:
+            return
+        self._index_app(i, app, remove=True)
+        self._apps[i] = None  # type: ignore
+        self._names[i] = ""
+
+    def _index_app(self, i: int, app: CatalogApp, remove: bool = False):
+        keys = []
+        for field in get_search_fields(app):
+            for token in tokenize(field):
+                keys.extend(
+                    (self._prefixes, token[:end]) for end in range(1, len(token) + 1)
+                )
+            keys.extend((self._trigrams, trigram) for trigram in trigrams(field))
+        for index, key in keys:
+            if not remove:
+                index.setdefault(key, set()).add(i)
+            elif key in index:
+                index[key].discard(i)
+                index.pop(key) if not index[key] else None
+
+    def get_candidates(self, query: str) -> tuple[set[int], list[int]]:
+        words = tokenize(query)
+        prefix_hits: set[int] = set()
+        if words:
+            prefix_hits = set(self._prefixes.get(words[0], ()))
+            for word in words[1:]:
+                prefix_hits &= self._prefixes.get(word, set())
+
+        counts = Counter(
+            chain.from_iterable(
+                self._trigrams.get(trigram, ()) for trigram in trigrams(query)
+            )
+        )
+        trigram_hits = [i for i, _ in counts.most_common(MAX_CANDIDATES)]
+        return prefix_hits, trigram_hits
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        tie_breaker: Callable[[CatalogApp], float] | None = None,
+    ) -> list[CatalogApp]:
+        start = time.perf_counter()
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        ties: dict[int, float] = {}
+
+        def tie(i: int) -> float:
+            if not tie_breaker:
+                return 0
+            if i not in ties:
+                ties[i] = tie_breaker(self._apps[i])
+            return ties[i]
+
+        names = self._names
+        prefix_hits, trigram_hits = self.get_candidates(query)
+        max_prefix = MAX_CANDIDATES - TRIGRAM_CANDIDATES
+        if len(prefix_hits) > max_prefix:
+            # Short queries match too many apps to score all of them. Name
+            #   prefixes go first, then the tie breaker, then index order
+            #   which is name order for the initial list
+            starts = sorted(i for i in prefix_hits if names[i].startswith(query))
+            others = sorted(prefix_hits.difference(starts))
+            if tie_breaker:
+                picked = heapq.nlargest(max_prefix, starts, key=tie)
+                if len(picked) < max_prefix:
+                    picked += heapq.nlargest(
+                        max_prefix - len(picked), others, key=tie
+                    )
+            else:
+                picked = starts[:max_prefix]
+                picked += others[: max_prefix - len(picked)]
+            prefix_hits = set(picked)
+        # Trigram matches fill what the prefix matches left
+        trigram_hits = [i for i in trigram_hits if i not in prefix_hits][
+            : MAX_CANDIDATES - len(prefix_hits)
+        ]
+
+        scored = [
+            (
+                fuzz.partial_ratio(query, self._names[i])
+                + (PREFIX_BONUS if i in prefix_hits else 0),
+                tie(i),
+                i,
+            )
+            for i in prefix_hits.union(trigram_hits)
+        ]
+        scored.sort(key=lambda entry: (-entry[0], -entry[1], self._names[entry[2]]))
+        results = [self._apps[i] for _, _, i in scored[:limit]]
+
+        self.last_search_time = (time.perf_counter() - start) * 1000
+        return results
@@ -0,0 +1,128 @@
+import heapq
+import itertools
+import threading
+from typing import Any, Callable
+
+from gi.repository import GLib
+from loguru import logger
+
+# Lower value means decoded sooner
+PRIORITY_VISIBLE = 0
+PRIORITY_HIDDEN = 1
+
+
+# A fixed number of worker threads running decode jobs by priority. Jobs are
+#   keyed: submitting a key again supersedes the previous job, even one that
+#   is already running, cancelling a key drops it or discards its result. At
+#   most max_pending jobs wait, past that the least important one is dropped
+#   and on_dropped is told about it.
+#   Callbacks run on the main loop with (True, result) or (False, None).
+class DecodePool:
+    def __init__(
+        self,
+        workers: int = 2,
+        max_pending: int = 64,
+        on_dropped: Callable[[str], Any] | None = None,
+    ):
+        self.max_pending = max_pending
+        self.on_dropped = on_dropped
+        self._heap: list[tuple[int, float, int, str]] = []
+        self._counter = itertools.count()
+        # key -> (job id, priority, order, function, callback), only live jobs
+        self._pending: dict[str, tuple[int, int, float, Callable, Callable]] = {}
+        # key -> job id of the job a worker is running
+        self._running: dict[str, int] = {}
+        self._condition = threading.Condition()
+
+        self.completed = 0
+        self.cancelled = 0
+        self.dropped = 0
+
+        for _ in range(workers):
+            threading.Thread(target=self._worker_loop, daemon=True).start()
+
+    def submit(
+        self,
+        key: str,
+        function: Callable[[], Any],
+        callback: Callable[[tuple[bool, Any]], Any],
+        priority: int = PRIORITY_HIDDEN,
+        order: float = 0,
+    ):
+        dropped = None
+        with self._condition:
+            job_id = next(self._counter)
+            # The running job can't be interrupted, its result is discarded
+            if self._running.pop(key, None) is not None:
+                self.cancelled += 1
+            self._pending[key] = (job_id, priority, order, function, callback)
+            heapq.heappush(self._heap, (priority, order, job_id, key))
+            if len(self._pending) > self.max_pending:
+                dropped = max(
+                    self._pending, key=lambda k: self._pending[k][1:3]
+                )
+                del self._pending[dropped]
+                self.dropped += 1
+            self._condition.notify()
+        if dropped is not None and self.on_dropped:
+            self.on_dropped(dropped)
+
+    def set_priority(self, key: str, priority: int):
+        with self._condition:
+            if key not in self._pending:
+                return
+            job_id, old_priority, order, function, callback = self._pending[key]
+            if priority == old_priority:
+                return
+            # The old heap entry no longer matches and is skipped when popped
+            self._pending[key] = (job_id, priority, order, function, callback)
+            heapq.heappush(self._heap, (priority, order, job_id, key))
+
+    def cancel(self, key: str):
+        with self._condition:
+            if self._pending.pop(key, None) is not None:
+                self.cancelled += 1
+            if self._running.pop(key, None) is not None:
+                # Can't interrupt a decode, its result is discarded
+                self.cancelled += 1
+
+    def _next_job(self) -> tuple[str, int, Callable, Callable]:
+        with self._condition:
+            while True:
+                while self._heap:
+                    priority, _, job_id, key = heapq.heappop(self._heap)
+                    job = self._pending.get(key)
+                    if job is None or job[0] != job_id or job[1] != priority:
+                        continue
+                    del self._pending[key]
+                    self._running[key] = job_id
+                    return key, job_id, job[3], job[4]
+                self._condition.wait()
+
+    def _worker_loop(self):
+        while True:
+            key, job_id, function, callback = self._next_job()
+            try:
+                result = (True, function())
+            except Exception as e:
+                logger.error(f"[DecodePool] Failed to decode {key}: {e}")
+                result = (False, None)
+            GLib.idle_add(self._deliver, key, job_id, callback, result)
+
+    def _deliver(self, key: str, job_id: int, callback: Callable, result: tuple):
+        with self._condition:
+            # Cancelled or superseded while it was running
+            if self._running.get(key) != job_id:
+                return False
+            del self._running[key]
+        self.completed += 1
+        callback(result)
+        return False
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
@@ -0,0 +1,103 @@
+import queue
+import threading
+import time
+from typing import Any, Callable
+
+import gi
+from loguru import logger
+
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import GdkPixbuf, GLib
+
+# Hyprland monitor transform -> pixbuf rotation
+ROTATIONS = {
+    0: GdkPixbuf.PixbufRotation.NONE,
+    1: GdkPixbuf.PixbufRotation.CLOCKWISE,
+    2: GdkPixbuf.PixbufRotation.UPSIDEDOWN,
+    3: GdkPixbuf.PixbufRotation.COUNTERCLOCKWISE,
+}
+
+
+def scale_and_rotate(
+    pixbuf: GdkPixbuf.Pixbuf,
+    width: int,
+    height: int,
+    transform: int = 0,
+    interp_type: GdkPixbuf.InterpType = GdkPixbuf.InterpType.BILINEAR,
+) -> GdkPixbuf.Pixbuf:
+    scaled = pixbuf.scale_simple(max(width, 1), max(height, 1), interp_type)
+    rotation = ROTATIONS.get(transform % 4, GdkPixbuf.PixbufRotation.NONE)
+    if rotation == GdkPixbuf.PixbufRotation.NONE:
+        return scaled
+    return scaled.rotate_simple(rotation)
+
+
+# Captured frames are downsampled on worker threads, gdk-pixbuf releases the GIL
+#   while scaling so this scales with the number of workers. Results are handed
+#   back on the main loop with GLib.idle_add.
+class FramePipeline:
+    def __init__(self, workers: int = 2, threaded: bool = True):
+        self.threaded = threaded
+        self._queue: queue.Queue = queue.Queue()
+        self._workers: list[threading.Thread] = []
+
+        # Seconds spent on the main loop, used to compare the two modes
+        self.main_loop_time = 0.0
+        self.worker_time = 0.0
+        self.processed = 0
+
+        if threaded:
+            for _ in range(workers):
+                worker = threading.Thread(target=self._worker_loop, daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def submit(
+        self,
+        pixbuf: GdkPixbuf.Pixbuf,
+        width: int,
+        height: int,
+        transform: int,
+        callback: Callable[[GdkPixbuf.Pixbuf, Any], Any],
+        user_data: Any = None,
+    ):
+        job = (pixbuf, width, height, transform, callback, user_data)
+        if not self.threaded:
+            start = time.perf_counter()
+            self._run_job(job, deliver=False)
+            self.main_loop_time += time.perf_counter() - start
+            return
+        self._queue.put(job)
+
+    def _worker_loop(self):
+        while True:
+            job = self._queue.get()
+            try:
+                start = time.perf_counter()
+                self._run_job(job, deliver=True)
+                self.worker_time += time.perf_counter() - start
+            finally:
+                self._queue.task_done()
+
+    def _run_job(self, job: tuple, deliver: bool):
+        pixbuf, width, height, transform, callback, user_data = job
+        try:
+            result = scale_and_rotate(pixbuf, width, height, transform)
+        except Exception as e:
+            logger.error(f"[FramePipeline] Failed to scale frame: {e}")
+            return
+        self.processed += 1
+        if deliver:
+            GLib.idle_add(self._deliver, callback, result, user_data)
+        else:
+            callback(result, user_data)
+
+    def _deliver(self, callback: Callable, result: GdkPixbuf.Pixbuf, user_data):
+        start = time.perf_counter()
+        callback(result, user_data)
+        self.main_loop_time += time.perf_counter() - start
+        return False
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
@@ -0,0 +1,86 @@
+import json
+import math
+import os
+import time
+
+from loguru import logger
+
+from fabric_config.utils.json_store import DebouncedJsonWriter
+
+
+# Launch counts with exponential time decay
+#   Each entry keeps a score that was valid at `updated`. The score halves every
+#   `half_life` seconds and every launch adds one, so frequent and recent
+#   launches both rank high. Writes are debounced and done off the main thread.
+class FrecencyStore:
+    def __init__(
+        self,
+        path: str,
+        half_life: float = 7 * 24 * 60 * 60,
+        legacy_recent_path: str | None = None,
+    ):
+        self.path = path
+        self.half_life = half_life
+        # name -> [score, updated, launch count]
+        self._entries: dict[str, list[float]] = self._load(legacy_recent_path)
+        self._writer = DebouncedJsonWriter(
+            path,
+            lambda: {name: list(entry) for name, entry in self._entries.items()},
+            log_tag="Frecency",
+        )
+
+    def _load(self, legacy_recent_path: str | None) -> dict[str, list[float]]:
+        if os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, OSError):
+                logger.info("[Frecency] Cache file does not exist or is corrupted")
+                return {}
+
+        # Seed from the old recent list, most recent first
+        if legacy_recent_path and os.path.exists(legacy_recent_path):
+            try:
+                with open(legacy_recent_path) as f:
+                    recent = json.load(f)
+                now = time.time()
+                return {
+                    name: [float(len(recent) - i), now, 1]
+                    for i, name in enumerate(recent)
+                }
+            except (json.JSONDecodeError, OSError):
+                pass
+        return {}
+
+    def _decayed(self, entry: list[float], now: float) -> float:
+        return entry[0] * math.pow(0.5, (now - entry[1]) / self.half_life)
+
+    def get_score(self, name: str) -> float:
+        entry = self._entries.get(name)
+        return self._decayed(entry, time.time()) if entry else 0.0
+
+    def add_launch(self, name: str):
+        now = time.time()
+        entry = self._entries.get(name)
+        if entry:
+            entry[0] = self._decayed(entry, now) + 1
+            entry[1] = now
+            entry[2] += 1
+        else:
+            self._entries[name] = [1.0, now, 1]
+        self._writer.queue()
+
+    def remove(self, name: str):
+        if self._entries.pop(name, None) is not None:
+            self._writer.queue()
+
+    def top(self, count: int) -> list[str]:
+        now = time.time()
+        return sorted(
+            self._entries,
+            key=lambda name: self._decayed(self._entries[name], now),
+            reverse=True,
+        )[:count]
+
+    def flush(self, blocking: bool = False):
+        self._writer.flush(blocking)
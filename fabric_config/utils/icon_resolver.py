@@ -1,13 +1,18 @@
 import json
 import os
 import re
+from collections import OrderedDict
+from typing import Callable
 
 import gi
 
 gi.require_version("Gtk", "3.0")
-from gi.repository import GLib, Gtk
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import GdkPixbuf, Gio, GLib, Gtk
 from loguru import logger
 
+from fabric_config.utils.json_store import DebouncedJsonWriter, write_json_atomic
+
 
 # TODO WIP
 # Idea: nearest string matching algorithm
@@ -18,23 +23,201 @@ from loguru import logger
 
 CACHE_DIR = str(GLib.get_user_cache_dir()) + "/fabric"
 ICON_CACHE_FILE = CACHE_DIR + "/icons.json"
+ICON_CACHE_FLUSH_DELAY_MS = 2000
+ICON_PIXBUF_CACHE_BYTES = 16 * 1024 * 1024
 if not os.path.exists(CACHE_DIR):
     os.makedirs(CACHE_DIR)
 
 
-class IconResolver:
-    def __init__(self, default_applicaiton_icon: str = "application-x-executable-symbolic"):
-        if os.path.exists(ICON_CACHE_FILE):
-            f = open(ICON_CACHE_FILE)
-            try:
-                self._icon_dict = json.load(f)
-            except json.JSONDecodeError:
-                logger.info("[ICONS] Cache file does not exist or is corrupted")
-            f.close()
+def load_icon_cache() -> dict:
+    if not os.path.exists(ICON_CACHE_FILE):
+        return {}
+    try:
+        with open(ICON_CACHE_FILE) as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        logger.info("[ICONS] Cache file does not exist or is corrupted")
+    return {}
+
+
+def write_icon_cache(icons: dict, removed: set):
+    # Merge with whatever is on disk, another instance may have written to it
+    merged = {k: v for k, v in load_icon_cache().items() if k not in removed}
+    merged.update(icons)
+    try:
+        write_json_atomic(ICON_CACHE_FILE, merged)
+    except OSError as e:
+        logger.error(f"[ICONS] Failed to write icon cache: {e}")
+
+
+def normalize_app_id(app_id: str) -> str:
+    return "".join(app_id.lower().split())
+
+
+def split_app_id(app_id: str) -> list[str]:
+    return [word.lower() for word in filter(None, re.split(r"-|\.|_|\s", app_id))]
+
+
+def parse_desktop_entry(desktop_file_path: str) -> dict[str, str]:
+    # Only the keys from the [Desktop Entry] section
+    entry = {}
+    in_section = False
+    try:
+        with open(desktop_file_path, errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    if in_section:
+                        break
+                    in_section = line == "[Desktop Entry]"
+                elif in_section and "=" in line:
+                    key, value = line.split("=", 1)
+                    entry.setdefault(key.strip(), value.strip())
+    except OSError:
+        pass
+    return entry
+
+
+class DesktopFileIndex:
+    # Maps desktop file ids, StartupWMClass, Exec basenames and the words of
+    #   the file id to the Icon= of each desktop file. Built on the first
+    #   lookup, most app ids are answered by the icon cache and the theme
+    #   without it. Then kept current by directory monitors on every
+    #   applications dir.
+    def __init__(self, default_icon: str, watch: bool = True):
+        self.default_icon = default_icon
+        self._exact: dict[str, str] = {}
+        self._words: dict[str, str] = {}
+        self._files: dict[str, dict[str, str]] = {}
+        self._loaded = False
+        self._monitors: list[Gio.FileMonitor] = []
+        self.on_changed: Callable[[], None] | None = None
+
+        if not watch:
+            return
+        for data_dir in self.get_application_dirs():
+            if not os.path.isdir(data_dir):
+                continue
+            monitor = Gio.File.new_for_path(data_dir).monitor_directory(
+                Gio.FileMonitorFlags.NONE, None
+            )
+            monitor.connect("changed", self.on_directory_changed)
+            self._monitors.append(monitor)
+
+    def load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        for data_dir in self.get_application_dirs():
+            if not os.path.isdir(data_dir):
+                continue
+            for file_name in os.listdir(data_dir):
+                if file_name.endswith(".desktop"):
+                    self._files.setdefault(
+                        file_name, parse_desktop_entry(data_dir + file_name)
+                    )
+        self.rebuild()
+
+    @staticmethod
+    def get_application_dirs() -> list[str]:
+        # Earlier directories take precedence, same as the XDG spec
+        return [
+            data_dir + "/applications/"
+            for data_dir in [GLib.get_user_data_dir(), *GLib.get_system_data_dirs()]
+        ]
+
+    def rebuild(self):
+        self._exact.clear()
+        self._words.clear()
+        for file_name, entry in self._files.items():
+            icon = entry.get("Icon") or self.default_icon
+            file_id = file_name.removesuffix(".desktop")
+            keys = [file_id, entry.get("StartupWMClass", "")]
+            exec_line = entry.get("Exec", "").split()
+            if exec_line:
+                keys.append(os.path.basename(exec_line[0]))
+            for key in filter(None, map(normalize_app_id, keys)):
+                self._exact.setdefault(key, icon)
+            for word in split_app_id(file_id):
+                self._words.setdefault(word, icon)
+
+    def lookup(self, app_id: str) -> str | None:
+        self.load()
+        icon = self._exact.get(normalize_app_id(app_id))
+        if icon:
+            return icon
+        for word in split_app_id(app_id):
+            if word in self._words:
+                return self._words[word]
+        return None
+
+    def update_file(self, desktop_file_path: str):
+        if not self._loaded:
+            # Picked up by the first lookup
+            self.on_changed() if self.on_changed else None
+            return
+        file_name = os.path.basename(desktop_file_path)
+        # A file shadowed by one in a higher precedence dir stays shadowed
+        for data_dir in self.get_application_dirs():
+            if os.path.exists(data_dir + file_name):
+                self._files[file_name] = parse_desktop_entry(data_dir + file_name)
+                break
         else:
-            self._icon_dict = {}
+            self._files.pop(file_name, None)
+        self.rebuild()
+        self.on_changed() if self.on_changed else None
+
+    def on_directory_changed(
+        self, _, file: Gio.File, _other, event: Gio.FileMonitorEvent
+    ):
+        path = file.get_path()
+        if not path or not path.endswith(".desktop"):
+            return
+        if event in (
+            Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+            Gio.FileMonitorEvent.DELETED,
+            Gio.FileMonitorEvent.MOVED_IN,
+            Gio.FileMonitorEvent.MOVED_OUT,
+            Gio.FileMonitorEvent.RENAMED,
+        ):
+            logger.info(f"[ICONS] desktop file changed: {path}")
+            self.update_file(path)
+
+
+class IconResolver:
+    def __init__(
+        self,
+        default_applicaiton_icon: str = "application-x-executable-symbolic",
+        watch_desktop_files: bool = True,
+    ):
+        self._icon_dict = load_icon_cache()
+        # Pending cache writes, flushed in batches off the main thread
+        self._removed_icons: set[str] = set()
+        self._writer = DebouncedJsonWriter(
+            ICON_CACHE_FILE,
+            self._take_changes,
+            delay_ms=ICON_CACHE_FLUSH_DELAY_MS,
+            write=lambda changes: write_icon_cache(*changes),
+        )
+
+        # (icon name, size, scale) -> pixbuf, dropped when the theme changes
+        self._pixbuf_cache: OrderedDict[tuple[str, int, int], GdkPixbuf.Pixbuf] = (
+            OrderedDict()
+        )
+        self._pixbuf_cache_bytes = 0
+        self.pixbuf_cache_max_bytes = ICON_PIXBUF_CACHE_BYTES
+        self.pixbuf_cache_hits = 0
+        self.pixbuf_cache_misses = 0
+        Gtk.IconTheme.get_default().connect(
+            "changed", lambda *_: self.clear_pixbuf_cache()
+        )
 
         self.default_applicaiton_icon = default_applicaiton_icon
+        # Without watching, changes are pushed through update_desktop_file
+        self._desktop_index = DesktopFileIndex(
+            default_applicaiton_icon, watch=watch_desktop_files
+        )
+        self._desktop_index.on_changed = self._forget_missing_icons
 
     def get_icon_name(self, app_id: str):
         if app_id in self._icon_dict:
@@ -46,56 +229,73 @@ class IconResolver:
         self._store_new_icon(app_id, new_icon)
         return new_icon
 
-    def get_icon_pixbuf(self, app_id: str, size: int = 16):
-        return Gtk.IconTheme.get_default().load_icon(
-            self.get_icon_name(app_id),
+    def get_icon_pixbuf(self, app_id: str, size: int = 16, scale: int = 1):
+        key = (self.get_icon_name(app_id), size, scale)
+        pixbuf = self._pixbuf_cache.get(key)
+        if pixbuf is not None:
+            self.pixbuf_cache_hits += 1
+            self._pixbuf_cache.move_to_end(key)
+            return pixbuf
+
+        self.pixbuf_cache_misses += 1
+        pixbuf = Gtk.IconTheme.get_default().load_icon_for_scale(
+            key[0],
             size,
+            scale,
             Gtk.IconLookupFlags.FORCE_SIZE,
         )
+        if pixbuf is not None:
+            self._pixbuf_cache[key] = pixbuf
+            self._pixbuf_cache_bytes += pixbuf.get_byte_length()
+            while self._pixbuf_cache_bytes > self.pixbuf_cache_max_bytes:
+                _, evicted = self._pixbuf_cache.popitem(last=False)
+                self._pixbuf_cache_bytes -= evicted.get_byte_length()
+        return pixbuf
+
+    def clear_pixbuf_cache(self):
+        self._pixbuf_cache.clear()
+        self._pixbuf_cache_bytes = 0
+
+    @property
+    def pixbuf_cache_stats(self) -> dict:
+        return {
+            "hits": self.pixbuf_cache_hits,
+            "misses": self.pixbuf_cache_misses,
+            "entries": len(self._pixbuf_cache),
+            "bytes": self._pixbuf_cache_bytes,
+        }
+
+    def update_desktop_file(self, desktop_file_path: str):
+        self._desktop_index.update_file(desktop_file_path)
 
     def _store_new_icon(self, app_id: str, icon: str):
         self._icon_dict[app_id] = icon
-        with open(ICON_CACHE_FILE, "w") as f:
-            json.dump(self._icon_dict, f)
-            f.close()
-
-    def _get_icon_from_desktop_file(self, desktop_file_path: str):
-        # TODO: get icon in the [Desktop Entry] section only
-        with open(desktop_file_path) as f:
-            for line in f.readlines():
-                if "Icon=" in line:
-                    return "".join(line[5:].split())
-            return self.default_applicaiton_icon
-
-    def _get_desktop_file(self, app_id: str) -> str | None:
-        data_dirs = GLib.get_system_data_dirs()
-        for data_dir in data_dirs:
-            data_dir = data_dir + "/applications/"
-            if os.path.exists(data_dir):
-                # Do name resolving here
-
-                files = os.listdir(data_dir)
-                matching = [
-                    s for s in files if "".join(app_id.lower().split()) in s.lower()
-                ]
-                if matching:
-                    return data_dir + matching[0]
-
-                for word in list(filter(None, re.split(r"-|\.|_|\s", app_id))):
-                    matching = [s for s in files if word.lower() in s.lower()]
-                    if matching:
-                        return data_dir + matching[0]
+        self._removed_icons.discard(app_id)
+        self._writer.queue()
 
-        return None
+    def _forget_missing_icons(self):
+        # Apps that fell back to the default may have a desktop file now
+        missing = [
+            app_id
+            for app_id, icon in self._icon_dict.items()
+            if icon == self.default_applicaiton_icon
+        ]
+        for app_id in missing:
+            del self._icon_dict[app_id]
+        self._removed_icons.update(missing)
+        self._writer.queue() if missing else None
+
+    def _take_changes(self) -> tuple[dict, set]:
+        icons, removed = dict(self._icon_dict), set(self._removed_icons)
+        self._removed_icons.clear()
+        return icons, removed
+
+    def flush(self, blocking: bool = False):
+        self._writer.flush(blocking)
 
     def _compositor_find_icon(self, app_id: str):
         if Gtk.IconTheme.get_default().has_icon(app_id):
             return app_id
         if Gtk.IconTheme.get_default().has_icon(app_id + "-desktop"):
             return app_id + "-desktop"
-        desktop_file = self._get_desktop_file(app_id)
-        return (
-            self._get_icon_from_desktop_file(desktop_file)
-            if desktop_file
-            else self.default_applicaiton_icon
-        )
+        return self._desktop_index.lookup(app_id) or self.default_applicaiton_icon
@@ -0,0 +1,95 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Callable
+
+from gi.repository import GLib
+from loguru import logger
+
+FLUSH_DELAY_MS = 2000
+
+
+def write_json_atomic(path: str, data) -> None:
+    # Readers either see the old file or the new one, never a partial write
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}-"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    finally:
+        # Only still there when the write failed
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# Batches changes to a json file: queue() marks it dirty and at most one write
+#   happens per delay_ms, off the main thread. `snapshot` runs on the main
+#   thread and returns what `write` gets, anything still dirty is written on
+#   exit.
+class DebouncedJsonWriter:
+    def __init__(
+        self,
+        path: str,
+        snapshot: Callable[[], Any],
+        delay_ms: int = FLUSH_DELAY_MS,
+        write: Callable[[Any], None] | None = None,
+        log_tag: str = "JSON",
+    ):
+        self.path = path
+        self.snapshot = snapshot
+        self.delay_ms = delay_ms
+        self.write = write or (lambda data: write_json_atomic(path, data))
+        self.log_tag = log_tag
+        self._dirty = False
+        self._source: int | None = None
+        self._write_lock = threading.Lock()
+        # Writer threads may run out of order, an older snapshot that gets
+        #   the lock after a newer one was written is dropped
+        self._generation = 0
+        self._written_generation = 0
+        atexit.register(self.flush, True)
+
+    def queue(self):
+        self._dirty = True
+        if self._source is None:
+            self._source = GLib.timeout_add(self.delay_ms, self._on_timeout)
+        return False
+
+    def write_now(self, blocking: bool = False):
+        self._dirty = True
+        self.flush(blocking)
+
+    def _on_timeout(self):
+        self._source = None
+        self.flush()
+        return False
+
+    def flush(self, blocking: bool = False):
+        if self._source is not None:
+            GLib.source_remove(self._source)
+            self._source = None
+        if not self._dirty:
+            return
+        self._dirty = False
+        data = self.snapshot()
+        self._generation += 1
+        generation = self._generation
+
+        def thread_function():
+            with self._write_lock:
+                if generation < self._written_generation:
+                    return
+                self._written_generation = generation
+                try:
+                    self.write(data)
+                except (OSError, TypeError, ValueError) as e:
+                    logger.error(f"[{self.log_tag}] Failed to write {self.path}: {e}")
+
+        if blocking:
+            thread_function()
+        else:
+            threading.Thread(target=thread_function, daemon=True).start()
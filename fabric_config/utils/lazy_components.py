@@ -0,0 +1,56 @@
+import time
+from typing import Any, Callable
+
+from gi.repository import GLib
+from loguru import logger
+
+from fabric_config.utils.startup_profiler import profiler
+
+
+# Windows that are not needed for the first frame are registered here and
+#   only built when first asked for. Components registered with prewarm are
+#   built one per idle callback once the main loop is running.
+class LazyComponents:
+    def __init__(self, on_built: Callable[[Any], None] | None = None):
+        self.on_built = on_built
+        self._factories: dict[str, Callable[[], Any]] = {}
+        self._instances: dict[str, Any] = {}
+        self._prewarm: list[str] = []
+        # name -> milliseconds spent in the factory
+        self.build_times: dict[str, float] = {}
+
+    def register(self, name: str, factory: Callable[[], Any], prewarm: bool = False):
+        self._factories[name] = factory
+        self._prewarm.append(name) if prewarm else None
+
+    def is_built(self, name: str) -> bool:
+        return name in self._instances
+
+    def get(self, name: str) -> Any:
+        if name in self._instances:
+            return self._instances[name]
+        start = time.perf_counter()
+        instance = self._factories[name]()
+        self.build_times[name] = (time.perf_counter() - start) * 1000
+        profiler.record(
+            f"component:{name}",
+            (start - profiler.start) * 1000,
+            self.build_times[name],
+        )
+        logger.info(f"[Components] Built {name} in {self.build_times[name]:.1f}ms")
+        self._instances[name] = instance
+        self.on_built(instance) if self.on_built else None
+        return instance
+
+    def prewarm(self):
+        if self._prewarm:
+            GLib.idle_add(self._prewarm_next, priority=GLib.PRIORITY_LOW)
+
+    def _prewarm_next(self):
+        while self._prewarm:
+            name = self._prewarm.pop(0)
+            if not self.is_built(name):
+                self.get(name)
+                # Let the main loop draw before the next one
+                return bool(self._prewarm)
+        return False
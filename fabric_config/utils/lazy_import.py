@@ -0,0 +1,34 @@
+import importlib.machinery
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def find_spec(name: str) -> importlib.machinery.ModuleSpec | None:
+    # importlib.util.find_spec imports the parent package of a submodule
+    parent_name = name.rpartition(".")[0]
+    if not parent_name or parent_name in sys.modules:
+        return importlib.util.find_spec(name)
+    parent_spec = find_spec(parent_name)
+    if parent_spec is None or parent_spec.submodule_search_locations is None:
+        return None
+    return importlib.machinery.PathFinder.find_spec(
+        name, parent_spec.submodule_search_locations
+    )
+
+
+# Returns the module without running it, its code runs on the first attribute
+#   access. Used for heavy dependencies of features that may never be touched
+#   in a session, so shell startup does not pay for them.
+def lazy_import(name: str) -> ModuleType:
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = find_spec(name)
+    if spec is None or spec.loader is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,131 @@
+import re
+
+# Decides from the first bytes of a payload whether it is one of the image
+#   formats gdk-pixbuf has loaders for. Text is recognised without looking at
+#   more than SNIFF_BYTES, only unknown binary data needs libmagic. Signatures
+#   short enough to start ordinary text are only trusted with a valid header.
+
+SNIFF_BYTES = 512
+
+# (offset, signature, mime type)
+SIGNATURES: list[tuple[int, bytes, str]] = [
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (0, b"II*\x00", "image/tiff"),
+    (0, b"MM\x00*", "image/tiff"),
+    (0, b"\x00\x00\x01\x00", "image/x-icon"),
+    (0, b"\x00\x00\x02\x00", "image/x-icon"),
+    (0, b"\xff\x0a", "image/jxl"),
+    (0, b"\x00\x00\x00\x0cJXL \r\n\x87\n", "image/jxl"),
+    (0, b"/* XPM */", "image/x-xpixmap"),
+]
+# RIFF containers, the format is at offset 8
+RIFF_FORMATS = {b"WEBP": "image/webp", b"ACON": "application/x-navi-animation"}
+# ISO base media files, the brand is at offset 8
+FTYP_BRANDS = {
+    b"avif": "image/avif",
+    b"avis": "image/avif",
+    b"heic": "image/heif",
+    b"heix": "image/heif",
+    b"mif1": "image/heif",
+}
+# Sizes of the known BITMAPINFOHEADER versions, at offset 14
+BMP_DIB_HEADER_SIZES = {12, 40, 52, 56, 64, 108, 124}
+# Magic number, then width, height and for all but bitmaps the max value,
+#   with comments allowed in between
+PNM_HEADER_PATTERN = re.compile(rb"P([1-6])")
+PNM_VALUE_PATTERN = re.compile(rb"(?:\s+|#[^\n]*\n)+(\d+)")
+XBM_PATTERN = re.compile(
+    rb"#define\s+\S*_width\s+\d+\s+#define\s+\S*_height\s+\d+\s+"
+    rb"(?:#define[^\n]*\n\s*)*static\s+(?:unsigned\s+)?char\s+\S*_bits\s*\[\]"
+)
+SVG_PATTERN = re.compile(rb"<svg[\s>]", re.IGNORECASE)
+TEXT_MIME_TYPE = "text/plain"
+
+
+def is_bmp(data: bytes) -> bool:
+    return (
+        data.startswith(b"BM")
+        and int.from_bytes(data[14:18], "little") in BMP_DIB_HEADER_SIZES
+    )
+
+
+def is_icns(data: bytes) -> bool:
+    # The header holds the length of the whole file
+    return data.startswith(b"icns") and int.from_bytes(data[4:8], "big") == len(data)
+
+
+def is_qoi(data: bytes) -> bool:
+    # Channels and colorspace follow the width and height
+    return data.startswith(b"qoif") and data[12:13] in (b"\x03", b"\x04") and (
+        data[13:14] in (b"\x00", b"\x01")
+    )
+
+
+def is_pnm(data: bytes) -> bool:
+    match = PNM_HEADER_PATTERN.match(data)
+    if not match:
+        return False
+    kind = int(match.group(1))
+    values = []
+    pos = match.end()
+    for _ in range(2 if kind in (1, 4) else 3):
+        match = PNM_VALUE_PATTERN.match(data, pos)
+        if not match:
+            return False
+        values.append(int(match.group(1)))
+        pos = match.end()
+    if not all(values) or data[pos : pos + 1] not in b" \t\r\n" or pos == len(data):
+        return False
+
+    width, height = values[:2]
+    body = data[pos + 1 :]
+    if kind == 1:
+        # Plain bitmaps may leave out the whitespace between pixels
+        return len(re.findall(rb"[01]", body)) == width * height and not (
+            re.search(rb"[^01\s]", body)
+        )
+    if kind in (2, 3):
+        samples = width * height * (3 if kind == 3 else 1)
+        return len(body.split()) == samples and body.translate(
+            None, b"0123456789 \t\r\n"
+        ) == b""
+    if kind == 4:
+        return len(body) == (width + 7) // 8 * height
+    sample_bytes = 2 if values[2] > 255 else 1
+    return len(body) == width * height * (3 if kind == 6 else 1) * sample_bytes
+
+
+def sniff_mime_type(data: bytes) -> str | None:
+    # Returns an image mime type, TEXT_MIME_TYPE for text, or None for binary
+    #   data without a known signature
+    head = data[:SNIFF_BYTES]
+    for offset, signature, mime_type in SIGNATURES:
+        if head.startswith(signature, offset):
+            return mime_type
+    if head.startswith(b"RIFF") and head[8:12] in RIFF_FORMATS:
+        return RIFF_FORMATS[head[8:12]]
+    if head[4:8] == b"ftyp" and head[8:12] in FTYP_BRANDS:
+        return FTYP_BRANDS[head[8:12]]
+    if is_bmp(head):
+        return "image/bmp"
+    if is_icns(data):
+        return "image/x-icns"
+    if is_qoi(head):
+        return "image/qoi"
+    if is_pnm(data):
+        return "image/x-portable-anymap"
+
+    if b"\x00" in head:
+        return None
+    # Text based image formats, anything else that is text stays text
+    stripped = head.lstrip()
+    if XBM_PATTERN.match(stripped):
+        return "image/x-xbitmap"
+    if (stripped.startswith(b"<?xml") or stripped.startswith(b"<svg")) and (
+        SVG_PATTERN.search(head)
+    ):
+        return "image/svg+xml"
+    return TEXT_MIME_TYPE
@@ -0,0 +1,73 @@
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+import gi
+
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import GdkPixbuf
+
+
+# Scaled window previews, keyed by (client key, target size)
+#   Neither Glace nor the hyprland IPC report damage, so entries also expire
+#   after `max_age` seconds which stands in for content changes.
+
+
+class PreviewCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_age: float = 30.0):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._entries: OrderedDict[
+            tuple[str, Hashable], tuple[GdkPixbuf.Pixbuf, int, float]
+        ] = OrderedDict()
+        self._keys: dict[str, set[tuple[str, Hashable]]] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, size: Hashable) -> GdkPixbuf.Pixbuf | None:
+        entry = self._entries.get((key, size))
+        if entry is None or time.monotonic() - entry[2] > self.max_age:
+            self._pop((key, size)) if entry else None
+            self.misses += 1
+            return None
+        self._entries.move_to_end((key, size))
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: str, size: Hashable, pixbuf: GdkPixbuf.Pixbuf):
+        self._pop((key, size))
+        nbytes = pixbuf.get_byte_length()
+        if nbytes > self.max_bytes:
+            return
+        self._entries[(key, size)] = (pixbuf, nbytes, time.monotonic())
+        self._keys.setdefault(key, set()).add((key, size))
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+
+    def invalidate(self, key: str):
+        for entry_key in list(self._keys.get(key, ())):
+            self._pop(entry_key)
+
+    def clear(self):
+        self._entries.clear()
+        self._keys.clear()
+        self._bytes = 0
+
+    def _pop(self, entry_key: tuple[str, Hashable]):
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return
+        self._bytes -= entry[1]
+        keys = self._keys[entry_key[0]]
+        keys.discard(entry_key)
+        if not keys:
+            del self._keys[entry_key[0]]
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,4 +1,5 @@
 import mmap
+from collections import OrderedDict
 
 import cairo
 import gi
@@ -28,25 +29,80 @@ from fabric.core.service import Service, Signal
 
 gi.require_version("Gdk", "3.0")
 gi.require_version("GdkPixbuf", "2.0")
-from gi.repository import Gdk, GdkPixbuf
+from gi.repository import Gdk, GdkPixbuf, GLib
+
+# Each one is a full size frame, the least recently captured windows give
+#   theirs up first
+MAX_CACHED_BUFFERS = 8
+
+
+class ShmBuffer:
+    def __init__(self, shm: WlShmProxy, fmt: int, width: int, height: int, stride: int):
+        self.key = (fmt, width, height, stride)
+        self.width = width
+        self.height = height
+        self.stride = stride
+        self.in_use = False
+
+        size = stride * height
+        with AnonymousFile(size) as fd:
+            self.data = mmap.mmap(
+                fd, size, prot=mmap.PROT_READ | mmap.PROT_WRITE, flags=mmap.MAP_SHARED
+            )
+            pool: WlShmPoolProxy = shm.create_pool(fd, size)  # type: ignore
+            self.buffer: WlBufferProxy = pool.create_buffer(
+                0, width, height, stride, fmt
+            )  # type: ignore
+            pool.destroy()
+
+    def destroy(self):
+        self.buffer.destroy()
+        self.data.close()
 
 
 class ClientOutput(Service):
     @Signal
     def frame_ready(self, address: str, pixbuf: GdkPixbuf.Pixbuf) -> None: ...
 
-    def __init__(self):
+    def __init__(self, asynchronous: bool = False):
         super().__init__()
         self.shm: WlShmProxy | None = None
         self.hyprland_toplevel_export_manager: (
             HyprlandToplevelExportManagerV1Proxy | None
         ) = None
+        # One reusable buffer per recently captured window, replaced when the
+        #   window is resized
+        self._buffers: OrderedDict[str, ShmBuffer] = OrderedDict()
+        self.asynchronous = asynchronous
 
         self.display = Display()
         self.display.connect()
         registry = self.display.get_registry()  # type: ignore
         registry.dispatcher["global"] = self.registry_global_handler
-        self.display.dispatch(block=True)
+        self.display.roundtrip() if asynchronous else self.display.dispatch(
+            block=True
+        )
+
+        if asynchronous:
+            # Events are read and dispatched from the GLib main loop, no call
+            # after this one waits on the compositor
+            self._watch_source = GLib.unix_fd_add_full(
+                GLib.PRIORITY_DEFAULT,
+                self.display.get_fd(),
+                GLib.IOCondition.IN | GLib.IOCondition.ERR | GLib.IOCondition.HUP,
+                self._on_display_event,
+            )
+
+    def _on_display_event(self, _fd, condition: GLib.IOCondition):
+        if condition & (GLib.IOCondition.ERR | GLib.IOCondition.HUP):
+            logger.error("[PyWayland] Lost connection to the wayland display")
+            return False
+        while self.display.prepare_read() != 0:
+            self.display.dispatch(block=False)
+        self.display.read_events()
+        self.display.dispatch(block=False)
+        self.display.flush()
+        return True
 
     def grab_frame_for_address(self, hyprland_address: str):
         # Only grab frame once display is ready
@@ -78,63 +134,89 @@ class ClientOutput(Service):
         frame.dispatcher["buffer_done"] = self.on_buffer_done
         frame.dispatcher["ready"] = self.on_buffer_ready
         frame.dispatcher["failed"] = self.on_buffer_failed
-        self.display.roundtrip()
+        self._sync()
         # frame.dispatcher["damage"] = lambda *_: print(_)
 
-    def create_buffer_for_toplevel(self, frame, fmt, width, height, stride):
-        self.width = width
-        self.height = height
-        self.rowstride = stride
+    def _sync(self, wait_for_events: bool = False):
+        if self.asynchronous:
+            self.display.flush()
+            return
+        self.display.roundtrip()
+        # To get to on_buffer_ready
+        self.display.dispatch(block=True) if wait_for_events else None
 
-        size = stride * height
-        with AnonymousFile(size) as fd:
-            shm_data = mmap.mmap(
-                fd, size, prot=mmap.PROT_READ | mmap.PROT_WRITE, flags=mmap.MAP_SHARED
-            )
-            pool: WlShmPoolProxy = self.shm.create_pool(fd, size)  # type: ignore
-            buff = pool.create_buffer(0, width, height, stride, fmt)  # type: ignore
-            pool.destroy()
-            frame.user_data.extend([buff, shm_data])
+    def create_buffer_for_toplevel(self, frame, fmt, width, height, stride):
+        address = frame.user_data[0]
+        buffer = self._buffers.get(address)
+        if buffer is None or buffer.in_use or buffer.key != (fmt, width, height, stride):
+            if buffer is not None and not buffer.in_use:
+                buffer.destroy()
+            buffer = ShmBuffer(self.shm, fmt, width, height, stride)  # type: ignore
+            self._buffers[address] = buffer
+        self._buffers.move_to_end(address)
+        buffer.in_use = True
+        frame.user_data.append(buffer)
+        self._evict_buffers()
         return 0
 
+    def _evict_buffers(self):
+        # Buffers of captures in flight are skipped, they are freed on release
+        idle = [
+            address for address, buffer in self._buffers.items() if not buffer.in_use
+        ]
+        for address in idle[: max(len(self._buffers) - MAX_CACHED_BUFFERS, 0)]:
+            self._buffers.pop(address).destroy()
+
     def on_buffer_done(self, frame: HyprlandToplevelExportFrameV1Proxy):
-        buff: WlBufferProxy = frame.user_data[1]
-        frame.copy(buff, 0)
-        self.display.roundtrip()
-        # To get to on_buffer_ready
-        self.display.dispatch(block=True)
+        buffer: ShmBuffer = frame.user_data[1]
+        frame.copy(buffer.buffer, 0)
+        self._sync(wait_for_events=True)
 
     def on_buffer_ready(self, frame, tv_sec_hi: int, tv_sec_lo: int, tv_nsec: int):
-        buff: WlBufferProxy = frame.user_data[1]
-        shm_data: mmap.mmap = frame.user_data[2]
+        buffer: ShmBuffer = frame.user_data[1]
 
         # CAIRO_FORMAT_RGB24 is xrgb
         try:
             with cairo.ImageSurface.create_for_data(
-                shm_data,  # type: ignore
+                buffer.data,  # type: ignore
                 cairo.FORMAT_RGB24,
-                self.width,
-                self.height,
-                self.rowstride,
+                buffer.width,
+                buffer.height,
+                buffer.stride,
             ) as surface:
                 pixbuf: GdkPixbuf.Pixbuf = Gdk.pixbuf_get_from_surface(
                     surface,
                     0,
                     0,
-                    self.width,
-                    self.height,
+                    buffer.width,
+                    buffer.height,
                 )
             self.emit("frame-ready", frame.user_data[0], pixbuf)
         except Exception as e:
             logger.error(e)
-            shm_data.close()
 
-        buff.destroy()
+        self._release_buffer(frame.user_data[0], buffer)
         frame.destroy()
 
     def on_buffer_failed(self, frame: HyprlandToplevelExportFrameV1Proxy):
         logger.error(f"[PyWayland] failed to copy buffer for {frame.user_data[0]}")
-        print(frame.user_data)
-        frame.user_data[1].destroy() if len(frame.user_data) > 1 else None
+        if len(frame.user_data) > 1:
+            self._release_buffer(frame.user_data[0], frame.user_data[1])
+            self.release_buffers(frame.user_data[0])
         frame.destroy()
         self.display.flush()
+
+    def _release_buffer(self, address: str, buffer: ShmBuffer):
+        buffer.in_use = False
+        # A newer buffer replaced this one while it was in flight
+        if self._buffers.get(address) is not buffer:
+            buffer.destroy()
+
+    def release_buffers(self, address: str):
+        buffer = self._buffers.get(address)
+        if buffer and not buffer.in_use:
+            self._buffers.pop(address).destroy()
+
+    def clear_buffers(self):
+        for address in list(self._buffers.keys()):
+            self.release_buffers(address)
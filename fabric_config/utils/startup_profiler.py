@@ -0,0 +1,182 @@
+import importlib.abc
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable
+
+from fabric_config.utils.json_store import write_json_atomic
+
+# Enabled with FABRIC_CONFIG_PROFILE=1 (or a report path) or --profile-startup.
+#   Must be imported before anything heavy so the imports after it are timed,
+#   main.py imports it first. When disabled every call is a plain passthrough.
+
+PROFILE_ENV = "FABRIC_CONFIG_PROFILE"
+PROFILE_FLAG = "--profile-startup"
+# Not through GLib, gi is one of the imports being timed
+DEFAULT_REPORT_FILE = (
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
+    + "/fabric/startup_profile.json"
+)
+REPORT_TOP_IMPORTS = 15
+
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, loader, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name: str):
+        # Resource readers and friends still reach the real loader
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler.enter_import(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.exit_import(module.__name__)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self._profiler)
+        return spec
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.report_path = DEFAULT_REPORT_FILE
+        self.start = time.perf_counter()
+        # module -> [total ms, self ms]
+        self.imports: dict[str, list[float]] = {}
+        # (name, start ms, duration ms), relative to self.start
+        self.spans: list[tuple[str, float, float]] = []
+        self.marks: dict[str, float] = {}
+        self._import_stack: list[list[float]] = []
+        self._finished = False
+
+    def enable(self, report_path: str | None = None):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.report_path = report_path or self.report_path
+        sys.meta_path.insert(0, _ImportTimer(self))
+
+    def elapsed(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def enter_import(self, name: str):
+        # [start, time spent in nested imports]
+        self._import_stack.append([time.perf_counter(), 0.0])
+
+    def exit_import(self, name: str):
+        start, children = self._import_stack.pop()
+        total = (time.perf_counter() - start) * 1000
+        self.imports[name] = [total, total - children]
+        if self._import_stack:
+            self._import_stack[-1][1] += total
+
+    def record(self, name: str, start: float, duration: float):
+        if not self.enabled:
+            return
+        self.spans.append((name, start, duration))
+        # Late spans (prewarmed components) are added to the written report
+        self.write_report() if self._finished else None
+
+    @contextmanager
+    def span(self, name: str):
+        start = self.elapsed()
+        try:
+            yield
+        finally:
+            self.record(name, start, self.elapsed() - start)
+
+    def measure(self, factory: Callable[..., Any], *args, **kwargs) -> Any:
+        if not self.enabled:
+            return factory(*args, **kwargs)
+        with self.span(getattr(factory, "__name__", str(factory))):
+            return factory(*args, **kwargs)
+
+    def mark(self, name: str):
+        if self.enabled:
+            self.marks.setdefault(name, self.elapsed())
+
+    def get_package_times(self) -> dict[str, float]:
+        # Self time summed per top level package, so nested imports are
+        #   charged to the package that actually ran them
+        packages: dict[str, float] = {}
+        for name, (_, self_time) in self.imports.items():
+            package = name.split(".")[0]
+            packages[package] = packages.get(package, 0.0) + self_time
+        return dict(sorted(packages.items(), key=lambda x: x[1], reverse=True))
+
+    def get_report(self) -> dict:
+        return {
+            "marks": self.marks,
+            "spans": [
+                {"name": name, "start": start, "duration": duration}
+                for name, start, duration in self.spans
+            ],
+            "packages": self.get_package_times(),
+            "imports": dict(
+                sorted(self.imports.items(), key=lambda x: x[1][0], reverse=True)
+            ),
+        }
+
+    def write_report(self):
+        try:
+            os.makedirs(os.path.dirname(self.report_path), exist_ok=True)
+            write_json_atomic(self.report_path, self.get_report())
+        except OSError as e:
+            print(
+                f"[Profiler] Failed to write {self.report_path}: {e}", file=sys.stderr
+            )
+
+    def format_report(self) -> str:
+        lines = ["[Profiler] Startup report"]
+        lines.extend(f"  {name:<32} {ms:8.1f}ms" for name, ms in self.marks.items())
+        lines.append("  -- constructors")
+        lines.extend(
+            f"  {name:<32} {duration:8.1f}ms (at {start:.1f}ms)"
+            for name, start, duration in self.spans
+        )
+        lines.append("  -- imports by package (self time)")
+        packages = list(self.get_package_times().items())[:REPORT_TOP_IMPORTS]
+        lines.extend(f"  {name:<32} {ms:8.1f}ms" for name, ms in packages)
+        return "\n".join(lines)
+
+    def finish(self):
+        if not self.enabled or self._finished:
+            return False
+        self._finished = True
+        self.write_report()
+        # Printed, the report is wanted whatever the log level is
+        print(self.format_report(), file=sys.stderr)
+        print(f"[Profiler] Report written to {self.report_path}", file=sys.stderr)
+        return False
+
+
+profiler = StartupProfiler()
+
+if os.environ.get(PROFILE_ENV) or PROFILE_FLAG in sys.argv:
+    if PROFILE_FLAG in sys.argv:
+        sys.argv.remove(PROFILE_FLAG)
+    env_value = os.environ.get(PROFILE_ENV, "")
+    profiler.enable(env_value if env_value not in ("", "1") else None)
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Callable
+
+import gi
+from loguru import logger
+
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import GdkPixbuf, GLib
+
+from fabric_config.utils.json_store import DebouncedJsonWriter
+
+CACHE_DIR = str(GLib.get_user_cache_dir()) + "/fabric"
+THUMBNAIL_DIR = CACHE_DIR + "/clipboard_thumbnails"
+THUMBNAIL_SIZES = (64, 256)
+THUMBNAIL_CACHE_BYTES = 64 * 1024 * 1024
+INDEX_FLUSH_DELAY_MS = 2000
+
+
+def hash_data(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def fit_size(width: int, height: int, size: int) -> tuple[int, int]:
+    scale = min(size / width, size / height, 1.0)
+    return max(int(width * scale), 1), max(int(height * scale), 1)
+
+
+# Pre-scaled previews of clipboard images stored as png files named by the
+#   hash of the decoded bytes, so the same image copied twice is stored once.
+#   An index maps cliphist ids to hashes, a warm start finds the preview of an
+#   entry without decoding it. cliphist reuses ids after a wipe, so the index
+#   also keeps the cliphist preview line and only answers when it matches.
+#   Files are evicted least recently used first once the directory grows past
+#   max_bytes.
+class ThumbnailCache:
+    def __init__(
+        self,
+        directory: str = THUMBNAIL_DIR,
+        max_bytes: int = THUMBNAIL_CACHE_BYTES,
+        sizes: tuple[int, ...] = THUMBNAIL_SIZES,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.sizes = sizes
+        self.index_path = directory + "/index.json"
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # cliphist id -> [content hash, cliphist preview]
+        self._index: dict[str, list[str]] = self._load_index()
+        # Computed on first store, from a worker thread
+        self._total_bytes: int | None = None
+        self._writer = DebouncedJsonWriter(
+            self.index_path,
+            self._snapshot_index,
+            delay_ms=INDEX_FLUSH_DELAY_MS,
+            log_tag="Thumbnails",
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def _load_index(self) -> dict[str, list[str]]:
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            logger.info("[Thumbnails] Index does not exist or is corrupted")
+            return {}
+        # Entries written without a preview can't be checked
+        return {
+            key: value
+            for key, value in index.items()
+            if isinstance(value, list) and len(value) == 2
+        }
+
+    def get_path(self, digest: str, size: int) -> str:
+        return f"{self.directory}/{digest}-{size}.png"
+
+    def lookup(self, cliphist_id: str, preview: str, size: int) -> str | None:
+        with self._lock:
+            entry = self._index.get(cliphist_id)
+        # A different entry that got the same id
+        digest = entry[0] if entry and entry[1] == preview else None
+        path = self.get_path(digest, size) if digest else None
+        if path is None or not os.path.exists(path):
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            # Marks it as recently used for eviction
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def create(
+        self,
+        cliphist_id: str,
+        preview: str,
+        digest: str,
+        load: Callable[[], GdkPixbuf.Pixbuf],
+        size: int,
+    ) -> GdkPixbuf.Pixbuf:
+        # Runs on a worker thread, only decodes when no entry had this content
+        self._remember(cliphist_id, [digest, preview])
+        path = self.get_path(digest, size)
+        if os.path.exists(path):
+            self.hits += 1
+            return GdkPixbuf.Pixbuf.new_from_file(path)
+        self.misses += 1
+
+        pixbuf = load()
+        thumbnail_for_size = None
+        written = 0
+        for thumbnail_size in self.sizes:
+            thumbnail = pixbuf.scale_simple(
+                *fit_size(pixbuf.get_width(), pixbuf.get_height(), thumbnail_size),
+                GdkPixbuf.InterpType.BILINEAR,
+            )
+            thumbnail_path = self.get_path(digest, thumbnail_size)
+            try:
+                thumbnail.savev(thumbnail_path, "png", [], [])
+                written += os.path.getsize(thumbnail_path)
+            except (GLib.Error, OSError) as e:
+                logger.error(f"[Thumbnails] Failed to write {thumbnail_path}: {e}")
+            if thumbnail_size == size:
+                thumbnail_for_size = thumbnail
+        self._add_bytes(written)
+        return thumbnail_for_size or pixbuf.scale_simple(
+            *fit_size(pixbuf.get_width(), pixbuf.get_height(), size),
+            GdkPixbuf.InterpType.BILINEAR,
+        )
+
+    def forget(self, cliphist_id: str):
+        # The files stay, another entry may have the same content
+        with self._lock:
+            if self._index.pop(cliphist_id, None) is None:
+                return
+        self._writer.queue()
+
+    def prune(self, cliphist_ids):
+        # Drops ids that are no longer in the history
+        keep = set(cliphist_ids)
+        with self._lock:
+            stale = [key for key in self._index if key not in keep]
+            for key in stale:
+                del self._index[key]
+        self._writer.queue() if stale else None
+
+    def _remember(self, cliphist_id: str, entry: list[str]):
+        with self._lock:
+            if self._index.get(cliphist_id) == entry:
+                return
+            self._index[cliphist_id] = entry
+        # Called from worker threads, the writer lives on the main loop
+        GLib.idle_add(self._writer.queue)
+
+    def _add_bytes(self, written: int):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._list_files())
+            else:
+                self._total_bytes += written
+            over = self._total_bytes > self.max_bytes
+        self.evict() if over else None
+
+    def _list_files(self) -> list[tuple[float, int, str]]:
+        files = []
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith(".png"):
+                continue
+            path = f"{self.directory}/{file_name}"
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        return files
+
+    def evict(self):
+        # Down to 3/4 of the cap, so eviction does not run on every store
+        files = sorted(self._list_files())
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * 3 // 4
+        removed = 0
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        with self._lock:
+            self._total_bytes = total
+        logger.info(f"[Thumbnails] Evicted {removed} thumbnails")
+
+    def _snapshot_index(self) -> dict[str, list[str]]:
+        with self._lock:
+            return dict(self._index)
+
+    def flush(self, blocking: bool = False):
+        self._writer.flush(blocking)
@@ -1,6 +1,7 @@
 from .circleimage import CircleImage
 from .player import PlayerBox, PlayerBoxStack
 from .popup_window_v2 import PopupWindow
+from .recycled_list import RecycledList
 from .rounded_image import CustomImage
 
 __all__ = [
@@ -8,5 +9,6 @@ __all__ = [
     "PlayerBox",
     "PlayerBoxStack",
     "PopupWindow",
+    "RecycledList",
     "CustomImage",
 ]
@@ -1,10 +1,11 @@
+import os
 from typing import Literal
 
-from fabric_config.utils.hyprland_monitor import HyprlandWithMonitors
-from gi.repository import GLib, Gdk
+from gi.repository import GLib, Gdk, Gtk
 
 from fabric.widgets.box import Box
 from fabric.widgets.eventbox import EventBox
+from fabric.widgets.overlay import Overlay
 from fabric.widgets.revealer import Revealer
 from fabric.widgets.wayland import WaylandWindow
 from fabric.widgets.widget import Widget
@@ -13,6 +14,26 @@ from fabric.widgets.widget import Widget
 # Greatly inspired by:
 #   CREDIT TO AYLUR: https://github.com/Aylur/dotfiles/blob/main/ags/widget/PopupWindow.ts
 
+# "window": every popup is its own full screen layer surface
+# "shared": every popup on a monitor and layer lives in one surface (PopupHost),
+#   the outside clicks are taken by the host, not by the popup's own padding
+POPUP_HOST_MODE = os.environ.get("FABRIC_CONFIG_POPUP_HOST", "window")
+
+# Where make_layout would place the popup, as overlay child alignments
+ANCHOR_ALIGNMENTS = {
+    "center-left": (Gtk.Align.START, Gtk.Align.CENTER),
+    "center": (Gtk.Align.CENTER, Gtk.Align.CENTER),
+    "center-right": (Gtk.Align.END, Gtk.Align.CENTER),
+    "top": (Gtk.Align.CENTER, Gtk.Align.START),
+    "top-right": (Gtk.Align.END, Gtk.Align.START),
+    "top-center": (Gtk.Align.CENTER, Gtk.Align.START),
+    "top-left": (Gtk.Align.START, Gtk.Align.START),
+    "bottom-left": (Gtk.Align.START, Gtk.Align.END),
+    "bottom-center": (Gtk.Align.CENTER, Gtk.Align.END),
+    "bottom-right": (Gtk.Align.END, Gtk.Align.END),
+}
+KEYBOARD_MODE_ORDER = ["none", "on-demand", "exclusive"]
+
 
 class Padding(EventBox):
     def __init__(self, name: str | None = None, style: str = "", **kwargs):
@@ -53,12 +74,12 @@ class PopupRevealer(EventBox):
             transition_duration=transition_duration,
             notify_child_revealed=lambda revealer, _: [
                 revealer.hide(),
-                popup_window.set_visible(False),
+                popup_window.set_surface_visible(False),
             ]
             if not revealer.fully_revealed
             else None,
             notify_reveal_child=lambda revealer, _: [
-                popup_window.set_visible(True),
+                popup_window.set_surface_visible(True),
             ]
             if revealer.child_revealed
             else None,
@@ -198,6 +219,83 @@ def make_layout(anchor: str, name: str, popup: PopupRevealer, **kwargs) -> Box:
             return None
 
 
+class PopupHost(WaylandWindow):
+    # One surface per monitor and layer holding the revealers of every shared
+    #   popup. A single padding behind them takes the outside clicks and is
+    #   named after the topmost shown popup so it is styled like that popup's
+    #   own padding. Input and keyboard mode follow the popups that are shown.
+    def __init__(
+        self,
+        monitor: int | None = None,
+        layer: Literal["background", "bottom", "top", "overlay"] = "top",
+    ):
+        # Shown popups, the last one is on top
+        self.popups: list["PopupWindow"] = []
+        self.padding = Padding(
+            name="popup-host",
+            on_button_press_event=self.on_inhibit_click,
+        )
+        self.overlay = Overlay(child=self.padding)
+        super().__init__(
+            layer=layer,
+            keyboard_mode="none",
+            visible=False,
+            exclusivity="normal",
+            anchor="top bottom right left",
+            child=self.overlay,
+            on_key_release_event=self.on_key_release,
+        )
+        if monitor is not None:
+            self.monitor = monitor
+
+    def add_popup(self, popup: "PopupWindow"):
+        self.overlay.add_overlay(popup.reveal_child)
+
+    def remove_popup(self, popup: "PopupWindow"):
+        self.set_popup_visible(popup, False)
+        self.overlay.remove(popup.reveal_child)
+
+    def set_popup_visible(self, popup: "PopupWindow", visible: bool):
+        if visible and popup not in self.popups:
+            self.popups.append(popup)
+            self.overlay.reorder_overlay(popup.reveal_child, -1)
+        elif not visible and popup in self.popups:
+            self.popups.remove(popup)
+        self.update_surface()
+
+    def update_surface(self):
+        self.set_property(
+            "pass-through", not any(popup.enable_inhibitor for popup in self.popups)
+        )
+        self.keyboard_mode = max(
+            (popup.popup_keyboard_mode for popup in self.popups),
+            key=KEYBOARD_MODE_ORDER.index,
+            default="none",
+        )
+        if self.popups:
+            self.padding.set_name(self.popups[-1].popup_name)
+        self.set_visible(bool(self.popups))
+
+    def on_inhibit_click(self, *_):
+        for popup in list(self.popups):
+            popup.on_inhibit_click() if popup.enable_inhibitor else None
+
+    def on_key_release(self, widget, event_key: Gdk.EventKey):
+        # Only the topmost popup that takes keyboard input
+        for popup in reversed(self.popups):
+            if popup.popup_keyboard_mode != "none":
+                return popup.on_key_release(widget, event_key)
+
+
+_popup_hosts: dict[tuple[int | None, str], PopupHost] = {}
+
+
+def get_popup_host(monitor: int | None, layer: str = "top") -> PopupHost:
+    if (monitor, layer) not in _popup_hosts:
+        _popup_hosts[(monitor, layer)] = PopupHost(monitor, layer)
+    return _popup_hosts[(monitor, layer)]
+
+
 class PopupWindow(WaylandWindow):
     def __init__(
         self,
@@ -231,8 +329,15 @@ class PopupWindow(WaylandWindow):
         enable_inhibitor: bool = False,
         keyboard_mode: Literal["none", "exclusive", "on-demand"] = "on-demand",
         timeout: int = 1000,
+        shared_host: bool | None = None,
     ):
         self._layer = layer
+        self.popup_name = name
+        self.popup_keyboard_mode = keyboard_mode
+        self.shared_host = (
+            POPUP_HOST_MODE == "shared" if shared_host is None else shared_host
+        )
+        self._host: PopupHost | None = None
         self.timeout = timeout
         self.currtimeout = 0
         self.popup_running = False
@@ -242,7 +347,6 @@ class PopupWindow(WaylandWindow):
         self.enable_inhibitor = enable_inhibitor
 
         self.monitor_number: int | None = None
-        self.hyprland_monitor = HyprlandWithMonitors()
 
         self.reveal_child = PopupRevealer(
             name=name,
@@ -253,13 +357,16 @@ class PopupWindow(WaylandWindow):
             decorations=decorations,
         )
 
+        # In a shared host this window is never mapped, it has no surface
         super().__init__(
             layer=self._layer,
             keyboard_mode=keyboard_mode,
             visible=False,
             exclusivity="normal",
             anchor="top bottom right left",
-            child=make_layout(
+            child=None
+            if self.shared_host
+            else make_layout(
                 anchor=anchor,
                 name=name,
                 popup=self.reveal_child,
@@ -267,6 +374,38 @@ class PopupWindow(WaylandWindow):
             ),
             on_key_release_event=self.on_key_release,
         )
+        if self.shared_host:
+            h_align, v_align = ANCHOR_ALIGNMENTS[anchor]
+            self.reveal_child.set_halign(h_align)
+            self.reveal_child.set_valign(v_align)
+            self.reveal_child.set_visible(False)
+            self.set_popup_monitor(None)
+
+    def set_popup_monitor(self, monitor: int | None):
+        if not self.shared_host:
+            self.monitor = monitor
+            return
+        host = get_popup_host(monitor, self._layer)
+        if host is self._host:
+            return
+        shown = False
+        if self._host is not None:
+            shown = self in self._host.popups
+            self._host.remove_popup(self)
+        self._host = host
+        host.add_popup(self)
+        host.set_popup_visible(self, shown)
+
+    def set_surface_visible(self, visible: bool):
+        if not self.shared_host:
+            return self.set_visible(visible)
+        self.reveal_child.set_visible(visible)
+        self._host.set_popup_visible(self, visible)
+
+    def set_pass_through(self):
+        # A shared host works it out from all of its shown popups
+        if not self.shared_host:
+            self.set_property("pass-through", not self.enable_inhibitor)
 
     def on_key_release(self, _, event_key: Gdk.EventKey):
         if event_key.keyval == Gdk.KEY_Escape:
@@ -279,8 +418,8 @@ class PopupWindow(WaylandWindow):
 
     def toggle_popup(self, monitor: bool = False):
         if monitor:
-            curr_monitor = self.hyprland_monitor.get_current_gdk_monitor_id()
-            self.monitor = curr_monitor
+            curr_monitor = self.get_current_gdk_monitor_id()
+            self.set_popup_monitor(curr_monitor)
             if self.monitor_number != curr_monitor and self.popup_visible:
                 self.monitor_number = curr_monitor
                 return
@@ -290,13 +429,20 @@ class PopupWindow(WaylandWindow):
         if not self.popup_visible:
             self.reveal_child.revealer.show()
 
-        self.set_property("pass-through", not self.enable_inhibitor)
+        self.set_pass_through()
         self.popup_visible = not self.popup_visible
         self.reveal_child.revealer.set_reveal_child(self.popup_visible)
 
+    def get_current_gdk_monitor_id(self) -> int | None:
+        # Kept current from focus and hotplug events, no IPC here. Imported
+        #   here, importing config builds every service
+        from fabric_config.config import monitor_tracker
+
+        return monitor_tracker.focused_gdk_monitor
+
     def popup_timeout(self):
-        curr_monitor = self.hyprland_monitor.get_current_gdk_monitor_id()
-        self.monitor = curr_monitor
+        curr_monitor = self.get_current_gdk_monitor_id()
+        self.set_popup_monitor(curr_monitor)
 
         if not self.popup_visible:
             self.reveal_child.revealer.show()
@@ -317,5 +463,5 @@ class PopupWindow(WaylandWindow):
             self.currtimeout += 500
             return True
 
-        self.set_property("pass-through", not self.enable_inhibitor)
+        self.set_pass_through()
         GLib.timeout_add(500, popup_func)
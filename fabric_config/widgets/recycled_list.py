@@ -0,0 +1,106 @@
+import math
+from typing import Any, Callable
+
+import gi
+from fabric.widgets.scrolledwindow import ScrolledWindow
+from fabric.widgets.widget import Widget
+
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gtk
+
+
+# Only the rows that fit in the viewport (plus one on each side) exist as
+#   widgets. They are placed on a Gtk.Layout as tall as the whole list, and
+#   rebound to other items as the list is scrolled or the items change.
+class RecycledList(ScrolledWindow):
+    def __init__(
+        self,
+        row_factory: Callable[[], Widget],
+        bind_row: Callable[[Widget, Any, int], None],
+        row_height: int | None = None,
+        viewport_height: int = 540,
+        **kwargs,
+    ):
+        self._row_factory = row_factory
+        self._bind_row = bind_row
+        self._row_height = row_height
+        self._viewport_height = viewport_height
+        self._items: list = []
+        self._rows: list[Widget] = []
+        # row -> index of the item it is bound to
+        self._bound: dict[Widget, int] = {}
+
+        self.layout = Gtk.Layout()
+        super().__init__(child=self.layout, **kwargs)
+        self.layout.get_vadjustment().connect(
+            "value-changed", lambda *_: self.update_rows()
+        )
+        self.layout.connect("size-allocate", self.on_layout_allocate)
+        if row_height is None:
+            # Measured from the first row, CSS may change it
+            self.layout.connect("style-updated", self.on_style_updated)
+
+    @property
+    def items(self) -> list:
+        return self._items
+
+    def set_items(self, items: list):
+        self._items = items
+        self._bound.clear()
+        self.layout.get_vadjustment().set_value(0)
+        self.update_rows()
+
+    def get_row_height(self) -> int:
+        if self._row_height is None and self._rows:
+            height = self._rows[0].get_preferred_height()[1]
+            if height > 1:
+                self._row_height = height
+        return self._row_height or 60
+
+    def get_bound_rows(self) -> list[tuple[Widget, int]]:
+        return list(self._bound.items())
+
+    def on_style_updated(self, *_):
+        self._row_height = None
+        self._bound.clear()
+        self.update_rows() if self._rows else None
+
+    def on_layout_allocate(self, _, allocation):
+        for row in self._rows:
+            if row.get_size_request()[0] != allocation.width:
+                row.set_size_request(allocation.width, -1)
+
+    def add_row(self):
+        row = self._row_factory()
+        row.show_all()
+        self._rows.append(row)
+        self.layout.put(row, 0, 0)
+        # Gtk.Layout has no natural width of its own
+        self.layout.set_size_request(row.get_preferred_width()[1], -1)
+
+    def update_rows(self):
+        if not self._rows:
+            self.add_row()
+        row_height = self.get_row_height()
+        pool_size = math.ceil(self._viewport_height / row_height) + 2
+        while len(self._rows) < pool_size:
+            self.add_row()
+
+        self.layout.set_size(
+            self.layout.get_allocated_width(), len(self._items) * row_height
+        )
+        first = max(
+            int(self.layout.get_vadjustment().get_value() // row_height) - 1, 0
+        )
+
+        for i, row in enumerate(self._rows):
+            index = first + i
+            if index >= len(self._items):
+                row.hide()
+                self._bound.pop(row, None)
+                continue
+            if self._bound.get(row) != index:
+                self._bind_row(row, self._items[index], index)
+                self._bound[row] = index
+                self.layout.move(row, 0, index * row_height)
+            row.show()